@@ -0,0 +1,99 @@
+--[[
+
+     Shared metrics for the DTOS bars
+
+     Subscribes to dtos-metricsd over its Unix socket (Gio, no child
+     processes) and hands every pushed snapshot to the registered
+     handlers. The daemon samples once for every screen and for Qtile, so
+     widgets here only render; the connection is retried every few
+     seconds while the daemon is not running.
+
+--]]
+
+local gears = require("gears")
+local lgi = require("lgi")
+local Gio = lgi.Gio
+local GLib = lgi.GLib
+local json = require("lain.util").dkjson
+
+local metrics = { handlers = {}, snapshot = {}, retry = 5 }
+
+metrics.socket = os.getenv("DTOS_METRICS_SOCKET")
+	or (os.getenv("XDG_RUNTIME_DIR") and os.getenv("XDG_RUNTIME_DIR") .. "/dtos-metrics.sock")
+	or string.format("/tmp/dtos-metrics-%s.sock", os.getenv("USER"))
+
+local connecting = false
+
+local function dispatch(snapshot)
+	for key, value in pairs(snapshot) do
+		metrics.snapshot[key] = value
+	end
+	for _, handler in ipairs(metrics.handlers) do
+		if snapshot[handler.key] ~= nil then
+			handler.callback(snapshot[handler.key], metrics.snapshot)
+		end
+	end
+end
+
+local function retry_later()
+	connecting = false
+	gears.timer.start_new(metrics.retry, function()
+		metrics.connect()
+		return false
+	end)
+end
+
+local function follow(stream, connection)
+	stream:read_line_async(GLib.PRIORITY_DEFAULT, nil, function(source, result)
+		local line = source:read_line_finish(result)
+		if not line then
+			connection:close()
+			retry_later()
+			return
+		end
+		local snapshot = json.decode(line)
+		if type(snapshot) == "table" then
+			dispatch(snapshot)
+		end
+		follow(stream, connection)
+	end)
+end
+
+-- Opens the subscription once; later calls are no-ops while it is up.
+function metrics.connect()
+	if connecting then
+		return
+	end
+	connecting = true
+	Gio.SocketClient():connect_async(Gio.UnixSocketAddress.new(metrics.socket), nil, function(source, result)
+		local connection = source:connect_finish(result)
+		if not connection then
+			retry_later()
+			return
+		end
+		connection:get_output_stream():write_all("subscribe\n")
+		follow(Gio.DataInputStream.new(connection:get_input_stream()), connection)
+	end)
+end
+
+-- Calls callback(value, snapshot) whenever metric key changes, starting with its current value.
+function metrics.on(key, callback)
+	table.insert(metrics.handlers, { key = key, callback = callback })
+	if metrics.snapshot[key] ~= nil then
+		callback(metrics.snapshot[key], metrics.snapshot)
+	end
+	metrics.connect()
+end
+
+-- Human-readable byte counts, e.g. 1.2M.
+function metrics.bytes(value)
+	local units = { "", "K", "M", "G" }
+	local i = 1
+	while value >= 1024 and i < #units do
+		value = value / 1024
+		i = i + 1
+	end
+	return i == 1 and string.format("%d", value) or string.format("%.1f%s", value, units[i])
+end
+
+return metrics
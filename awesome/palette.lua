@@ -0,0 +1,125 @@
+--[[
+
+     pywal palette hot-apply
+
+     Turns ~/.cache/wal/colors.json into beautiful overrides and hands them
+     to the running session through the "dtos::palette" signal, so the
+     theme repaints the existing wibars, arrows and client borders instead
+     of awesome.restart rebuilding them. colors.json is watched with a Gio
+     file monitor; `wal-awesome` can also request a re-apply.
+
+--]]
+
+local awful = require("awful")
+local beautiful = require("beautiful")
+local gears = require("gears")
+local lgi = require("lgi")
+local Gio = lgi.Gio
+local GLib = lgi.GLib
+local json = require("lain.util").dkjson
+
+local palette = {
+	path = (os.getenv("HOME") or "") .. "/.cache/wal/colors.json",
+	delay = 0.2,
+}
+
+-- beautiful key -> pywal color; "background"/"foreground" come from the special section.
+palette.map = {
+	bg_normal = "background",
+	fg_normal = "foreground",
+	bg_focus = "color5",
+	fg_focus = "color4",
+	taglist_fg_focus = "background",
+	tasklist_fg_focus = "color4",
+	border_normal = "background",
+	border_focus = "color1",
+	border_marked = "color3",
+	titlebar_bg_focus = "color5",
+	titlebar_bg_normal = "background",
+	titlebar_fg_focus = "color4",
+	bar_a = "color4",
+	bar_b = "color5",
+}
+
+-- Reads colors.json and returns the overrides, or nil if it is missing or unreadable.
+function palette.load(path)
+	local f = io.open(path or palette.path, "r")
+	if not f then
+		return nil
+	end
+	local wal = json.decode(f:read("*a"))
+	f:close()
+	if type(wal) ~= "table" or type(wal.colors) ~= "table" then
+		return nil
+	end
+	local special = wal.special or {}
+	local overrides = {}
+	for key, name in pairs(palette.map) do
+		overrides[key] = special[name] or wal.colors[name]
+	end
+	return overrides
+end
+
+-- Sets the overrides on the theme table, repaints client borders and lets the theme repaint its widgets.
+function palette.apply(overrides)
+	-- beautiful.get() is the table theme.lua returned, so `beautiful.x` and the theme's own widgets both see it
+	local theme = beautiful.get()
+	for key, value in pairs(overrides) do
+		theme[key] = value
+	end
+	local focused = client.focus
+	for _, c in ipairs(client.get()) do
+		c.border_color = c == focused and beautiful.border_focus or beautiful.border_normal
+	end
+	awesome.emit_signal("dtos::palette", overrides)
+end
+
+-- Loads and applies colors.json; returns true if there was a palette.
+function palette.reload()
+	local overrides = palette.load()
+	if overrides then
+		palette.apply(overrides)
+		return true
+	end
+	return false
+end
+
+-- Re-applies after colors.json changes. wal writes it in several steps,
+-- so events are coalesced for palette.delay seconds.
+function palette.watch()
+	if palette.monitor then
+		return
+	end
+	local pending = gears.timer({
+		timeout = palette.delay,
+		single_shot = true,
+		callback = palette.reload,
+	})
+	palette.monitor = Gio.File.new_for_path(palette.path):monitor_file(Gio.FileMonitorFlags.NONE)
+	palette.monitor.on_changed = function(_, _, _, event)
+		if event == "CHANGES_DONE_HINT" or event == "CREATED" or event == "CHANGED" then
+			pending:again()
+		end
+	end
+end
+
+-- Times n hot-applies of the current palette; returns ms per apply and the Lua heap growth in KB.
+function palette.bench(n)
+	n = n or 20
+	local overrides = palette.load()
+	if not overrides then
+		return "no palette at " .. palette.path
+	end
+	collectgarbage("collect")
+	local heap = collectgarbage("count")
+	local start = GLib.get_monotonic_time()
+	for _ = 1, n do
+		palette.apply(overrides)
+	end
+	awful.screen.focused().mywibox:draw()
+	local elapsed = (GLib.get_monotonic_time() - start) / 1000
+	collectgarbage("collect")
+	return string.format("%.2f ms/apply, heap %+.0f KB (%.0f KB)", elapsed / n, collectgarbage("count") - heap, heap)
+end
+
+return palette
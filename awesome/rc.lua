@@ -57,7 +57,7 @@ local function run_once(cmd_arr)
 	end
 end
 
-run_once({ "unclutter -root" }) -- entries must be comma-separated
+run_once({ "unclutter -root", "dm-docindex watch", "dm-mpd watch", "dtos-metricsd" }) -- entries must be comma-separated
 
 local themes = {
 	"powerarrow", -- 1
@@ -74,7 +74,9 @@ local ctrlkey = "Control"
 local terminal = "alacritty"
 local browser = "qutebrowser"
 local editor = os.getenv("EDITOR") or "vim"
-local emacs = "emacsclient -c -a 'emacs' "
+-- dtos-emacsd (started at the end of this file) keeps a server warm; its client waits for one that is starting.
+local emacsd = os.getenv("HOME") .. "/.local/bin/dtos-emacsd"
+local emacs = gears.filesystem.file_executable(emacsd) and (emacsd .. " client ") or "emacsclient -c -a 'emacs' "
 local mediaplayer = "mpv"
 local soundplayer = "ffplay -nodisp -autoexit " -- The program that will play system sounds
 
@@ -185,6 +187,11 @@ do
 	end
 end
 
+-- Follow pywal: apply ~/.cache/wal/colors.json now and repaint in place whenever it changes
+local palette = require("palette")
+palette.reload()
+palette.watch()
+
 local myawesomemenu = {
 	{
 		"hotkeys",
@@ -871,7 +878,8 @@ awful.spawn.with_shell("nm-applet")
 awful.spawn.with_shell("volumeicon")
 awful.spawn.with_shell("dunst")
 awful.spawn.with_shell("killall conky && conky -c $HOME/.config/conky/awesome/" .. "doom-one" .. "-01.conkyrc")
-awful.spawn.with_shell("/usr/bin/emacs --daemon")
+-- dtos-emacsd supervises the server (restarts it, tells the Qtile bindings when it is ready)
+awful.spawn.with_shell("if command -v dtos-emacsd >/dev/null 2>&1; then dtos-emacsd; else /usr/bin/emacs --daemon; fi")
 
 -- Original DTOS wallpaper autostart disabled (used ~/.cache/wall)
 -- awful.spawn.with_shell("xargs xwallpaper --stretch < ~/.cache/wall")
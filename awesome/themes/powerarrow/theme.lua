@@ -7,6 +7,7 @@
 
 local gears = require("gears")
 local lain = require("lain")
+local metrics = require("metrics")
 local awful = require("awful")
 local wibox = require("wibox")
 
@@ -31,6 +32,9 @@ theme.border_width = 2
 theme.border_normal = "#282a36"
 theme.border_focus = "#F07178"
 theme.border_marked = "#CC9393"
+-- Powerline segment colors; palette.lua overrides these (and the ones above) from pywal
+theme.bar_a = "#7197E7"
+theme.bar_b = "#A77AC4"
 theme.titlebar_bg_focus = "#3F3F3F"
 theme.titlebar_bg_normal = "#3F3F3F"
 theme.titlebar_bg_focus = theme.bg_focus
@@ -103,9 +107,7 @@ local separators = lain.util.separators
 
 -- Textclock
 local clockicon = wibox.widget.imagebox(theme.widget_clock)
-local clock = awful.widget.watch("date +'%a %d %b %R'", 60, function(widget, stdout)
-	widget:set_markup(" " .. markup.font(theme.font, stdout))
-end)
+local clock = wibox.widget.textclock(" " .. markup.font(theme.font, "%a %d %b %R"), 60)
 
 -- Calendar
 theme.cal = lain.widget.cal({
@@ -193,21 +195,20 @@ theme.mpd = lain.widget.mpd({
 	end,
 })
 
--- MEM
+-- MEM, CPU, temperature and net come from dtos-metricsd (see metrics.lua),
+-- which samples once for every screen instead of one lain timer per widget.
 local memicon = wibox.widget.imagebox(theme.widget_mem)
-local mem = lain.widget.mem({
-	settings = function()
-		widget:set_markup(markup.font(theme.font, " " .. mem_now.used .. "MB "))
-	end,
-})
+local mem = { widget = wibox.widget.textbox() }
+metrics.on("mem", function(now)
+	mem.widget:set_markup(markup.font(theme.font, " " .. math.floor(now.used / 1048576) .. "MB "))
+end)
 
 -- CPU
 local cpuicon = wibox.widget.imagebox(theme.widget_cpu)
-local cpu = lain.widget.cpu({
-	settings = function()
-		widget:set_markup(markup.font(theme.font, " " .. cpu_now.usage .. "% "))
-	end,
-})
+local cpu = { widget = wibox.widget.textbox() }
+metrics.on("cpu", function(now)
+	cpu.widget:set_markup(markup.font(theme.font, " " .. now.usage .. "% "))
+end)
 
 --[[ Coretemp (lm_sensors, per core)
 local tempwidget = awful.widget.watch({awful.util.shell, '-c', 'sensors | grep Core'}, 30,
@@ -219,12 +220,11 @@ function(widget, stdout)
     widget:set_markup(markup.font(theme.font, " " .. temps))
 end)
 --]]
--- Coretemp (lain, average)
-local temp = lain.widget.temp({
-	settings = function()
-		widget:set_markup(markup.font(theme.font, " " .. coretemp_now .. "°C "))
-	end,
-})
+-- Coretemp (average, from dtos-metricsd)
+local temp = { widget = wibox.widget.textbox() }
+metrics.on("temp", function(now)
+	temp.widget:set_markup(markup.font(theme.font, " " .. (now.celsius or "N/A") .. "°C "))
+end)
 --]]
 local tempicon = wibox.widget.imagebox(theme.widget_temp)
 
@@ -329,13 +329,12 @@ end
 
 -- Net
 local neticon = wibox.widget.imagebox(theme.widget_net)
-local net = lain.widget.net({
-	settings = function()
-		widget:set_markup(
-			markup.fontfg(theme.font, "#FEFEFE", " " .. net_now.received .. " ↓↑ " .. net_now.sent .. " ")
-		)
-	end,
-})
+local net = { widget = wibox.widget.textbox() }
+metrics.on("net", function(now)
+	net.widget:set_markup(
+		markup.fontfg(theme.font, "#FEFEFE", " " .. metrics.bytes(now.down) .. " ↓↑ " .. metrics.bytes(now.up) .. " ")
+	)
+end)
 
 -- Separators
 local arrow = separators.arrow_left
@@ -363,7 +362,24 @@ local function pl(widget, bgcolor, padding)
 	return wibox.container.background(wibox.container.margin(widget, 16, 16), bgcolor, theme.powerline_rl)
 end
 
+local function bar_color(key)
+	return key == "alpha" and "alpha" or theme[key]
+end
+
 function theme.at_screen_connect(s)
+	-- Arrows and segments are remembered per screen so a new palette can repaint them in place
+	s.palette_arrows, s.palette_segments = {}, {}
+	local function arrow_to(left, right)
+		local widget = arrow(bar_color(left), bar_color(right))
+		table.insert(s.palette_arrows, { widget = widget, left = left, right = right })
+		return widget
+	end
+	local function segment(widget, key, left, right)
+		local container = wibox.container.background(wibox.container.margin(widget, left, right), theme[key])
+		table.insert(s.palette_segments, { widget = container, key = key })
+		return container
+	end
+
 	-- Quake application
 	-- s.quake = lain.util.quake({ app = awful.util.terminal })
 	s.quake = lain.util.quake({ app = "termite", height = 0.50, argname = "--name %s" })
@@ -435,85 +451,53 @@ function theme.at_screen_connect(s)
 			-- using separators
 			--arrow(theme.bg_normal, "#343434"),
 			-- wibox.container.background(wibox.container.margin(wibox.widget { mailicon, mail and mail.widget, layout = wibox.layout.align.horizontal }, 4, 7), "#343434"),
-			arrow("alpha", "#7197E7"),
-			wibox.container.background(
-				wibox.container.margin(
-					wibox.widget({ mpdicon, theme.mpd.widget, layout = wibox.layout.align.horizontal }),
-					3,
-					6
-				),
-				"#7197E7"
-			),
-			arrow("#7197E7", "#A77AC4"),
-			wibox.container.background(
-				wibox.container.margin(
-					wibox.widget({ volicon, theme.volume.widget, layout = wibox.layout.align.horizontal }),
-					2,
-					3
-				),
-				"#A77AC4"
-			),
-			arrow("#A77AC4", "#7197E7"),
-			wibox.container.background(
-				wibox.container.margin(
-					wibox.widget({ memicon, mem.widget, layout = wibox.layout.align.horizontal }),
-					2,
-					3
-				),
-				"#7197E7"
-			),
-			arrow("#7197E7", "#A77AC4"),
-			wibox.container.background(
-				wibox.container.margin(
-					wibox.widget({ cpuicon, cpu.widget, layout = wibox.layout.align.horizontal }),
-					3,
-					4
-				),
-				"#A77AC4"
-			),
-			arrow("#A77AC4", "#7197E7"),
-			wibox.container.background(
-				wibox.container.margin(
-					wibox.widget({ tempicon, temp.widget, layout = wibox.layout.align.horizontal }),
-					4,
-					4
-				),
-				"#7197E7"
-			),
-			arrow("#7197E7", "#A77AC4"),
-			wibox.container.background(
-				wibox.container.margin(
-					wibox.widget({ weathericon, theme.weather.widget, layout = wibox.layout.align.horizontal }),
-					3,
-					3
-				),
-				"#A77AC4"
-			),
-			arrow("#A77AC4", "#7197E7"),
-			wibox.container.background(
-				wibox.container.margin(
-					wibox.widget({ baticon, bat.widget, layout = wibox.layout.align.horizontal }),
-					3,
-					3
-				),
-				"#7197E7"
-			),
-			arrow("#7197E7", "#A77AC4"),
-			wibox.container.background(
-				wibox.container.margin(
-					wibox.widget({ nil, neticon, net.widget, layout = wibox.layout.align.horizontal }),
-					3,
-					3
-				),
-				"#A77AC4"
-			),
-			arrow("#A77AC4", "#7197E7"),
-			wibox.container.background(wibox.container.margin(clock, 4, 8), "#7197E7"),
-			arrow("#7197E7", "alpha"),
+			arrow_to("alpha", "bar_a"),
+			segment(wibox.widget({ mpdicon, theme.mpd.widget, layout = wibox.layout.align.horizontal }), "bar_a", 3, 6),
+			arrow_to("bar_a", "bar_b"),
+			segment(wibox.widget({ volicon, theme.volume.widget, layout = wibox.layout.align.horizontal }), "bar_b", 2, 3),
+			arrow_to("bar_b", "bar_a"),
+			segment(wibox.widget({ memicon, mem.widget, layout = wibox.layout.align.horizontal }), "bar_a", 2, 3),
+			arrow_to("bar_a", "bar_b"),
+			segment(wibox.widget({ cpuicon, cpu.widget, layout = wibox.layout.align.horizontal }), "bar_b", 3, 4),
+			arrow_to("bar_b", "bar_a"),
+			segment(wibox.widget({ tempicon, temp.widget, layout = wibox.layout.align.horizontal }), "bar_a", 4, 4),
+			arrow_to("bar_a", "bar_b"),
+			segment(wibox.widget({ weathericon, theme.weather.widget, layout = wibox.layout.align.horizontal }), "bar_b", 3, 3),
+			arrow_to("bar_b", "bar_a"),
+			segment(wibox.widget({ baticon, bat.widget, layout = wibox.layout.align.horizontal }), "bar_a", 3, 3),
+			arrow_to("bar_a", "bar_b"),
+			segment(wibox.widget({ nil, neticon, net.widget, layout = wibox.layout.align.horizontal }), "bar_b", 3, 3),
+			arrow_to("bar_b", "bar_a"),
+			segment(clock, "bar_a", 4, 8),
+			arrow_to("bar_a", "alpha"),
 			--]]
 			s.mylayoutbox,
 		},
 	})
 end
 
+-- Repaint the existing bars when palette.lua delivers new colors (no awesome.restart)
+awesome.connect_signal("dtos::palette", function()
+	-- rc.lua may load this file more than once; only the theme in use repaints
+	if require("beautiful").get() ~= theme then
+		return
+	end
+	for s in screen do
+		if s.mywibox then
+			s.mywibox.bg = theme.bg_normal
+			s.mywibox.fg = theme.fg_normal
+		end
+		for _, entry in ipairs(s.palette_arrows or {}) do
+			entry.widget.update(bar_color(entry.left), bar_color(entry.right))
+		end
+		for _, entry in ipairs(s.palette_segments or {}) do
+			entry.widget.bg = theme[entry.key]
+		end
+		-- The taglist reads its colors from beautiful when it updates
+		for _, t in ipairs(s.tags) do
+			t:emit_signal("property::name")
+		end
+	end
+end)
+
 return theme
@@ -14,21 +14,97 @@ set -euo pipefail
 # Hard block: if DM_BLOCK is set, bail immediately so stray auto-launches do nothing.
 [ -n "${DM_BLOCK:-}" ] && exit 0
 
-# Log invocations to help trace unwanted auto-launches (e.g., dm-wifi popping up)
-{
-    script_name="$(basename "${0:-unknown}")"
-    parent_cmd=$(ps -o comm= -p "${PPID:-0}" 2>/dev/null || echo "unknown")
-    parent_line=$(ps -o pid=,ppid=,cmd= -p "${PPID:-0}" 2>/dev/null | tr -s ' ')
-    grandpid=$(ps -o ppid= -p "${PPID:-0}" 2>/dev/null | tr -d ' ' || echo "")
-    grand_line=
-    if [ -n "$grandpid" ]; then
-        grand_line=$(ps -o pid=,ppid=,cmd= -p "$grandpid" 2>/dev/null | tr -s ' ')
+# Log invocations to help trace unwanted auto-launches (e.g., dm-wifi popping up).
+# Everything is read from /proc with builtins, so tracing costs no forks. Records go
+# to a ring of DM_TRACE_SEGMENTS files holding DM_TRACE_LINES launches each; `_dm-trace`
+# summarizes them. DM_TRACE=0 disables tracing, 2 adds parent/grandparent cmdlines.
+DM_TRACE="${DM_TRACE:-1}"
+DM_TRACE_DIR="${DM_TRACE_DIR:-${XDG_RUNTIME_DIR:-/tmp}/dmscripts-trace}"
+DM_TRACE_SEGMENTS="${DM_TRACE_SEGMENTS:-8}"
+DM_TRACE_LINES="${DM_TRACE_LINES:-128}"
+
+# Reads /proc/<pid>/stat into _dm_comm and _dm_ppid.
+_dm_proc_stat() {
+    local stat="" fields=()
+    _dm_comm="?"
+    _dm_ppid=0
+    _dm_start=0
+    read -r stat 2>/dev/null <"/proc/$1/stat" || return 0
+    _dm_comm="${stat#*(}"
+    _dm_comm="${_dm_comm%)*}"
+    read -r -a fields <<<"${stat##*) }"
+    _dm_ppid="${fields[1]:-0}"
+    _dm_start="${fields[19]:-0}"
+}
+
+# Reads /proc/<pid>/cmdline into _dm_cmdline.
+_dm_proc_cmdline() {
+    local argv=()
+    _dm_cmdline=""
+    mapfile -d '' argv 2>/dev/null <"/proc/$1/cmdline" || return 0
+    _dm_cmdline="${argv[*]}"
+}
+
+# Milliseconds since this process started (USER_HZ is 100 on Linux).
+_dm_age_ms() {
+    local uptime=""
+    read -r uptime _ 2>/dev/null </proc/uptime || return 0
+    _dm_proc_stat "$$"
+    _dm_age=$((10#${uptime/./} * 10 - _dm_start * 10))
+}
+
+# Appends one tab-separated record to the current ring segment.
+# Fields: epoch event script pid ms ppid parent args parent_cmdline grandparent
+_dm_trace_write() {
+    printf '%s\t%s\t%s\t%s\t%s\t%s\t%s\t%s\t%s\t%s\n' "$EPOCHREALTIME" "$@" \
+        2>/dev/null >>"$DM_TRACE_DIR/$_dm_segment" || true
+}
+
+_dm_trace_start() {
+    local seq=0 parent_cmd="" grand=""
+    [ -d "$DM_TRACE_DIR" ] || mkdir -p "$DM_TRACE_DIR" 2>/dev/null || return 0
+
+    # The sequence number picks the segment; starting a new segment truncates it.
+    read -r seq 2>/dev/null <"$DM_TRACE_DIR/seq" || seq=0
+    printf '%s\n' "$((seq + 1))" 2>/dev/null >"$DM_TRACE_DIR/seq" || return 0
+    _dm_segment=$(((seq / DM_TRACE_LINES) % DM_TRACE_SEGMENTS))
+    ((seq % DM_TRACE_LINES)) || : >"$DM_TRACE_DIR/$_dm_segment"
+
+    _dm_age=0
+    _dm_age_ms
+    _dm_proc_stat "${PPID:-0}"
+    local parent="$_dm_comm" grandpid="$_dm_ppid"
+    if [ "$DM_TRACE" -ge 2 ]; then
+        _dm_proc_cmdline "${PPID:-0}"
+        parent_cmd="$_dm_cmdline"
+        _dm_proc_stat "$grandpid"
+        _dm_proc_cmdline "$grandpid"
+        grand="$grandpid $_dm_comm $_dm_cmdline"
     fi
-    tree=$(pstree -pal "${PPID:-0}" 2>/dev/null | head -n 1)
-    printf '%s script=%s ppid=%s parent=%s args="%s" pstree=%s parent_line=\"%s\" grand_line=\"%s\"\n' \
-        "$(date '+%F %T')" "$script_name" "${PPID:-?}" "$parent_cmd" "$*" "$tree" "$parent_line" "$grand_line" \
-        >>/tmp/dmscripts.trace
-} || true
+    _dm_trace_write start "${0##*/}" "$$" "$_dm_age" "${PPID:-0}" "$parent" "$*" "$parent_cmd" "$grand"
+    _dm_t0="$EPOCHREALTIME"
+    trap '_dm_trace_exit $?' EXIT
+}
+
+_dm_trace_exit() {
+    local now="${EPOCHREALTIME/./}" t0="${_dm_t0/./}"
+    _dm_trace_write "exit:$1" "${0##*/}" "$$" "$(((now - t0) / 1000))" "${PPID:-0}" "" "" "" ""
+    _dm_metric_write "$1" "$((now - t0 + _dm_age * 1000))"
+}
+
+# Feeds the run (process start to exit) into dtos_metrics.py's events file, in the line
+# format dtos-metrics.sh writes. Nothing is created here: until another entry point has
+# made the metrics directory this costs one test. DTOS_METRICS=0 turns it off.
+DM_METRICS_EVENTS="${DTOS_METRICS_DIR:-${XDG_CACHE_HOME:-$HOME/.cache}/dtos-pywal/metrics}/events"
+_dm_metric_write() {
+    [ "${DTOS_METRICS:-1}" = "0" ] && return 0
+    [ -d "${DM_METRICS_EVENTS%/*}" ] || return 0
+    printf 'dmscripts_run\tscript=%s\t%s\t%s\n' "${0##*/}" "$2" "$1" 2>/dev/null >>"$DM_METRICS_EVENTS" || true
+}
+
+if [ "$DM_TRACE" != "0" ]; then
+    _dm_trace_start "$@" || true
+fi
 
 if [[ "${BASH_SOURCE[0]}" == "${0}" ]]; then
     echo "This is a helper-script it does not do anything on its own."
@@ -61,23 +137,23 @@ display_available() {
     [ -n "${DISPLAY:-}" ] || [ -n "${WAYLAND_DISPLAY:-}" ]
 }
 
-# Use the current pywal palette for dmenu if available.
-apply_pywal_menu_colors() {
-    # Allow opting out by setting DMENU_PYWAL=0.
-    if [ "${DMENU_PYWAL:-1}" != "1" ]; then
-        return
-    fi
+DM_WAL_COLORS="$HOME/.cache/wal/colors.sh"
+# dtos-colorscheme installs its pre-rendered flags next to colors.sh.
+DM_WAL_MENU="$HOME/.cache/wal/dmenu-colors"
 
-    # Avoid touching non-dmenu launchers.
-    if [ -z "${DMENU:-}" ] || [[ "${DMENU}" != *dmenu* ]]; then
-        return
-    fi
+# Sets _dm_wal_menu to the dmenu color flags for the current pywal palette (empty if unusable).
+wal_menu_colors() {
+    _dm_wal_menu=""
+    [ -f "$DM_WAL_COLORS" ] || return 0
 
-    local wal_colors="$HOME/.cache/wal/colors.sh"
-    [ -f "$wal_colors" ] || return
+    # the flags file is only current until wal rewrites colors.sh
+    if [ -f "$DM_WAL_MENU" ] && ! [ "$DM_WAL_COLORS" -nt "$DM_WAL_MENU" ]; then
+        read -r _dm_wal_menu <"$DM_WAL_MENU" || true
+        return 0
+    fi
 
     # shellcheck disable=SC1090
-    . "$wal_colors"
+    . "$DM_WAL_COLORS"
 
     local bg="${background:-${color0:-}}"
     local fg="${foreground:-${color7:-}}"
@@ -86,9 +162,27 @@ apply_pywal_menu_colors() {
 
     # Require the basics so we don't emit an incomplete command.
     if [ -z "$bg" ] || [ -z "$fg" ] || [ -z "$accent" ]; then
+        return 0
+    fi
+    _dm_wal_menu="-nb ${bg} -nf ${fg} -sb ${accent} -sf ${sel_fg}"
+}
+
+# Use the current pywal palette for dmenu if available.
+# The flags come from the compiled environment when there is one, else from colors.sh.
+apply_pywal_menu_colors() {
+    # Allow opting out by setting DMENU_PYWAL=0.
+    if [ "${DMENU_PYWAL:-1}" != "1" ]; then
+        return
+    fi
+
+    # Avoid touching non-dmenu launchers.
+    if [ -z "${DMENU:-}" ] || [[ "${DMENU}" != *dmenu* ]]; then
         return
     fi
 
+    [ -n "${_dm_wal_menu+set}" ] || wal_menu_colors
+    [ -n "$_dm_wal_menu" ] || return 0
+
     # Rebuild the DMENU command so -p stays at the end and wal colors land before it.
     local prompt_flag="-p"
     local parts=()
@@ -104,7 +198,7 @@ apply_pywal_menu_colors() {
     done
 
     # Build without extra quoting so colors pass cleanly to dmenu/rofi.
-    DMENU="${rebuilt[*]} -nb ${bg} -nf ${fg} -sb ${accent} -sf ${sel_fg} ${prompt_flag}"
+    DMENU="${rebuilt[*]} ${_dm_wal_menu} ${prompt_flag}"
 }
 
 #function() {
@@ -216,46 +310,113 @@ Type $(basename "$0") -h for help" >/dev/stderr
 # 3. /etc/dmscripts/config - For the gloabl/default configuration
 #
 # Only 1 file is ever sourced
+#
+# Outside of the git repository the chosen config, the pywal menu colors and the
+# revision check are compiled into $DM_ENV_CACHE, which is all that gets sourced
+# until one of its source files is modified (DM_ENV_CACHE=0 disables it).
 
-# this warning is simply not necessary anywhere in the scope
-# shellcheck disable=SC1091
-source_dmscripts_configs() {
+DM_ENV_CACHE="${DM_ENV_CACHE:-${XDG_CACHE_HOME:-$HOME/.cache}/dmscripts/env}"
+
+# Sets _dm_config to the config file that would be sourced and _dm_sources to
+# every file the compiled environment depends on.
+locate_dmscripts_config() {
     # this is to ensure this variable is defined
     XDG_CONFIG_HOME="${XDG_CONFIG_HOME:-}"
+    _dm_config=""
 
     if [ -f "../config/config" ]; then
-        source "../config/config"
-        apply_pywal_menu_colors
-        return 0
+        _dm_config="../config/config"
+    elif [ -z "$XDG_CONFIG_HOME" ] && [ -f "$HOME/.config/dmscripts/config" ]; then
+        _dm_config="$HOME/.config/dmscripts/config"
+    elif [ -n "$XDG_CONFIG_HOME" ] && [ -f "$XDG_CONFIG_HOME/dmscripts/config" ]; then
+        _dm_config="$XDG_CONFIG_HOME/dmscripts/config"
+    elif [ -f "/etc/dmscripts/config" ]; then
+        _dm_config="/etc/dmscripts/config"
     fi
 
-    if [ -z "$XDG_CONFIG_HOME" ] && [ -f "$HOME/.config/dmscripts/config" ]; then
-        source "$HOME/.config/dmscripts/config"
-        apply_pywal_menu_colors
-        return 0
-    fi
+    # absolute paths, so the same files are recognised whichever directory a script runs from;
+    # builtins only, as this runs on every launch
+    local files=("${BASH_SOURCE[0]}") src
+    [ -n "$_dm_config" ] && files+=("$_dm_config")
+    [ -f "/etc/dmscripts/config" ] && files+=("/etc/dmscripts/config")
+    [ -f "$DM_WAL_COLORS" ] && files+=("$DM_WAL_COLORS")
+    [ -f "$DM_WAL_MENU" ] && files+=("$DM_WAL_MENU")
+    _dm_sources=""
+    for src in "${files[@]}"; do
+        case "$src" in
+            /*) ;;
+            */*) src="$PWD/${src#./}" ;;
+            # a bare name is how `source _dm-helper.sh` found it: on PATH
+            *) if hash -- "$src" 2>/dev/null; then src="${BASH_CMDS[$src]}"; else src="$PWD/$src"; fi ;;
+        esac
+        _dm_sources+="${_dm_sources:+:}$src"
+    done
+    return 0
+}
 
-    if [ -n "$XDG_CONFIG_HOME" ] && [ -f "$XDG_CONFIG_HOME/dmscripts/config" ]; then
-        source "$XDG_CONFIG_HOME/dmscripts/config"
-        apply_pywal_menu_colors
-        return 0
+# the compiled environment is valid if it was built from the same files and none changed since
+dmscripts_env_is_current() {
+    local header="" src
+    read -r header 2>/dev/null <"$DM_ENV_CACHE" || return 1
+    [ "$header" = "#sources=$_dm_sources" ] || return 1
+
+    local IFS=':'
+    for src in $_dm_sources; do
+        [ -n "$src" ] && [ "$src" -nt "$DM_ENV_CACHE" ] && return 1
+    done
+    return 0
+}
+
+# writes the config, the wal menu colors and the revision verdict into $DM_ENV_CACHE
+compile_dmscripts_env() {
+    local tmp="$DM_ENV_CACHE.$$" outdated=0
+    [ -d "${DM_ENV_CACHE%/*}" ] || mkdir -p "${DM_ENV_CACHE%/*}" || return 1
+
+    wal_menu_colors
+    revisions_differ && outdated=1
+
+    {
+        printf '#sources=%s\n' "$_dm_sources"
+        printf '# Compiled by _dm-helper.sh; regenerated when any file above changes.\n'
+        printf '_dm_wal_menu=%q\n' "$_dm_wal_menu"
+        printf '_dm_config_outdated=%s\n' "$outdated"
+        if [ -n "$_dm_config" ]; then
+            printf '\n# %s\n' "$_dm_config"
+            cat "$_dm_config"
+        fi
+    } >"$tmp" 2>/dev/null && mv -f "$tmp" "$DM_ENV_CACHE" && return 0
+    rm -f "$tmp"
+    return 1
+}
+
+# this warning is simply not necessary anywhere in the scope
+# shellcheck disable=SC1091
+source_dmscripts_configs() {
+    locate_dmscripts_config
+    _dm_env_rebuilt=0
+
+    if [ "$_dm_config" != "../config/config" ] && [ "$DM_ENV_CACHE" != "0" ]; then
+        if dmscripts_env_is_current || { compile_dmscripts_env && _dm_env_rebuilt=1; }; then
+            # shellcheck disable=SC1090
+            source "$DM_ENV_CACHE"
+            apply_pywal_menu_colors
+            return 0
+        fi
     fi
 
-    [ -f "/etc/dmscripts/config" ] && source "/etc/dmscripts/config"
+    [ -n "$_dm_config" ] && source "$_dm_config"
     apply_pywal_menu_colors
+    return 0
 }
 
-# checks the base configuration file and compares it with the local configuration file
-# if the numbers are different then the code will return 0, else 1
+# compares the _revision= lines of the base configuration file and the local configuration file
+# returns 0 if they are different, else 1
 #
 # this does not check the git config as it doesn't make sense
-configs_are_different() {
+revisions_differ() {
     local _base_file=""
     local _config_file=""
 
-    # DM_SHUTUP is a variable in the dmscript config that is intended to silence the notifications.
-    DM_SHUTUP="${DM_SHUTUP:-}"
-
     # it cannot determine if the files are different if it does not exist
     [ -f "/etc/dmscripts/config" ] && _base_file="/etc/dmscripts/config" || return 1
 
@@ -271,12 +432,26 @@ configs_are_different() {
     _config_file_revision=$(grep "^_revision=" "${_config_file}")
     _base_file_revision=$(grep "^_revision=" "${_base_file}")
 
-    if [[ ! "${_config_file_revision}" == "${_base_file_revision}" ]]; then
-        if [ -z "$DM_SHUTUP" ]; then
-            notify-send "dmscripts configuration outdated" "Review the differences of /etc/dmscripts/config and your local config and apply changes accordingly (dont forget to bump the revision number)"
-        fi
-        return 0
+    [[ ! "${_config_file_revision}" == "${_base_file_revision}" ]]
+}
+
+# checks the base configuration file and compares it with the local configuration file
+# if the numbers are different then the code will return 0, else 1
+#
+# with a compiled environment the verdict is cached, and only reported on the launch that
+# (re)compiled it so an outdated config does not cost every script a notification and a sleep
+configs_are_different() {
+    # DM_SHUTUP is a variable in the dmscript config that is intended to silence the notifications.
+    DM_SHUTUP="${DM_SHUTUP:-}"
+
+    if [ -n "${_dm_config_outdated:-}" ]; then
+        [ "$_dm_config_outdated" = "1" ] && [ "${_dm_env_rebuilt:-0}" = "1" ] || return 1
+    else
+        revisions_differ || return 1
     fi
 
-    return 1
+    if [ -z "$DM_SHUTUP" ]; then
+        notify-send "dmscripts configuration outdated" "Review the differences of /etc/dmscripts/config and your local config and apply changes accordingly (dont forget to bump the revision number)"
+    fi
+    return 0
 }
@@ -214,7 +214,7 @@ core_pkgs=(
     python-dbus-next pacman-contrib
     papirus-icon-theme papirus-folders
     git fzf wget curl unzip
-    python-psutil lm_sensors spice-vdagent
+    python-psutil python-numpy python-pillow lm_sensors spice-vdagent
     noto-fonts ttf-dejavu ttf-liberation ttf-ubuntu-font-family
 )
 
@@ -508,6 +508,23 @@ if [ -d "$SCRIPT_DIR/wal" ]; then
     '
 fi
 
+# Before the seeding below: postrun renders through dtos_render.py and friends in ~/.local/bin.
+run_step "Installing wal wallpaper helpers..." bash -c '
+  mkdir -p "$HOME/.local/bin"
+  for helper in "'"$SCRIPT_DIR"'/scripts/"*; do
+    [ -f "$helper" ] || continue
+    name="$(basename "$helper")"
+    case "$name" in
+      # Development tools run from the checkout.
+      wal-bench) continue ;;
+      # Sourced shell libraries: next to the scripts that source them, but not executable.
+      *.sh) install -m 644 "$helper" "$HOME/.local/bin/$name" ;;
+      # Everything else is an entry point (the dtos_*.py modules also have command lines).
+      *) install -m 755 "$helper" "$HOME/.local/bin/$name" ;;
+    esac
+  done
+'
+
 # Seed pywal cache once so colors are ready for widgets/GTK/KDE out of the box.
 run_step "Seeding pywal colors from a wallpaper (once)..." bash -c '
   pick_wall() {
@@ -545,18 +562,19 @@ run_step "Seeding pywal colors from a wallpaper (once)..." bash -c '
 # Wal helpers: wrapper + systemd watcher
 # ---------------------------------------------------------------------------
 
-run_step "Installing wal wallpaper helpers..." bash -c '
-  mkdir -p "$HOME/.local/bin"
-  if [ -f "'"$SCRIPT_DIR"'/scripts/wal-wallpaper" ]; then
-    cp "'"$SCRIPT_DIR"'/scripts/wal-wallpaper" "$HOME/.local/bin/wal-wallpaper"
-    chmod +x "$HOME/.local/bin/wal-wallpaper"
-  fi
-  if [ -f "'"$SCRIPT_DIR"'/scripts/wal-apply-cache" ]; then
-    cp "'"$SCRIPT_DIR"'/scripts/wal-apply-cache" "$HOME/.local/bin/wal-apply-cache"
-    chmod +x "$HOME/.local/bin/wal-apply-cache"
+# Hash the wallpapers now so the first "Similar" in dm-setbg does not wait for the index.
+run_step "Indexing wallpapers for similarity search (wal-similar)..." bash -c '
+  if python3 -c "import numpy" >/dev/null 2>&1; then
+    "$HOME/.local/bin/wal-similar" index >/dev/null 2>&1 || true
   fi
 '
 
+run_step "Building the accent lookup table (dtos_color.py)..." \
+    python3 "$HOME/.local/bin/dtos_color.py" build
+
+run_step "Rendering static color schemes (dtos-colorscheme)..." \
+    python3 "$HOME/.local/bin/dtos-colorscheme" build --colors "$SCRIPT_DIR/qtile/colors.py"
+
 if command -v systemctl >/dev/null 2>&1 && systemctl --user show-environment >/dev/null 2>&1; then
     run_step "Enabling wal cache watcher (systemd --user)..." bash -c '
       mkdir -p "$HOME/.config/systemd/user"
@@ -566,6 +584,10 @@ if command -v systemctl >/dev/null 2>&1 && systemctl --user show-environment >/d
       if [ -f "'"$SCRIPT_DIR"'/systemd/wal-cache-apply.path" ]; then
         cp "'"$SCRIPT_DIR"'/systemd/wal-cache-apply.path" "$HOME/.config/systemd/user/"
       fi
+      # Slideshow unit is installed but left disabled; enable it with systemctl --user.
+      if [ -f "'"$SCRIPT_DIR"'/systemd/wal-rotate.service" ]; then
+        cp "'"$SCRIPT_DIR"'/systemd/wal-rotate.service" "$HOME/.config/systemd/user/"
+      fi
       systemctl --user daemon-reload
       systemctl --user enable --now wal-cache-apply.path
     '
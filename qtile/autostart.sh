@@ -19,9 +19,42 @@ SESSION_TYPE="x11"
 # Dunst notification daemon
 dunst &
 
+# Warm Emacs server for the MOD + e chord, started early at low priority and restarted if it dies
+if command -v emacs >/dev/null 2>&1 && command -v dtos-emacsd >/dev/null 2>&1; then
+    dtos-emacsd >/dev/null 2>&1 &
+fi
+
 # Auto-reload Qtile when pywal colors change so widgets update without manual reloads
 "$HOME/.config/qtile/wal-reloader.sh" &
 
+# Keep one OpenRGB SDK connection open so wal palette changes reach RGB devices instantly
+if command -v openrgb >/dev/null 2>&1 && command -v wal-openrgb >/dev/null 2>&1; then
+    wal-openrgb --watch >/dev/null 2>&1 &
+fi
+
+# Keep the dm-documents index current with inotify
+if command -v dm-docindex >/dev/null 2>&1; then
+    dm-docindex watch >/dev/null 2>&1 &
+fi
+
+# One metrics sampler for every bar (Qtile and Awesome)
+if command -v dtos-metricsd >/dev/null 2>&1; then
+    dtos-metricsd >/dev/null 2>&1 &
+fi
+
+# Keep dm-music's MPD library cache current
+if command -v mpd >/dev/null 2>&1 && command -v dm-mpd >/dev/null 2>&1; then
+    dm-mpd watch >/dev/null 2>&1 &
+fi
+
+# Stage timings for dtos_metrics.py; install.sh puts the library in ~/.local/bin with the wal helpers.
+if [ -r "$HOME/.local/bin/dtos-metrics.sh" ]; then
+    . "$HOME/.local/bin/dtos-metrics.sh"
+else
+    # Helpers not installed: run untimed (every call below is STAGE LABELS -- CMD).
+    dtos_timed() { shift 3; "$@"; }
+fi
+
 ### WALLPAPER RESTORE LOGIC ###
 # We try, in order:
 #  1. Qtile-specific cache (~/.cache/wall_qtile) if it exists and is non-empty
@@ -66,7 +99,7 @@ choose_wallpaper() {
     [ ! -s "$target_file" ] && return 1
     read -r image_path <"$target_file"
     CHOSEN_WALL="$image_path"
-    set_wallpaper "$image_path"
+    dtos_timed wallpaper_setter "caller=autostart" -- set_wallpaper "$image_path"
 }
 
 if [ -s "$WALL_QTILE" ]; then
@@ -80,16 +113,16 @@ else
     if [ -d "$WALL_DIR" ]; then
         random_wall=$(find "$WALL_DIR" -type f | shuf -n 1)
         CHOSEN_WALL="$random_wall"
-        set_wallpaper "$random_wall"
+        dtos_timed wallpaper_setter "caller=autostart" -- set_wallpaper "$random_wall"
     fi
 fi
 
 # Re-apply pywal colors to match the chosen wallpaper (if pywal is installed)
 if command -v wal >/dev/null 2>&1; then
     if [ -n "$CHOSEN_WALL" ] && [ -f "$CHOSEN_WALL" ]; then
-        wal -n -q -i "$CHOSEN_WALL" >/dev/null 2>&1 || true
+        dtos_timed wal_run "caller=autostart" -- wal -n -q -i "$CHOSEN_WALL" >/dev/null 2>&1 || true
     elif [ -f "$HOME/.cache/wal/wal" ]; then
-        wal -R -n -q >/dev/null 2>&1 || true
+        dtos_timed wal_run "caller=autostart" -- wal -R -n -q >/dev/null 2>&1 || true
     fi
 fi
 
@@ -120,3 +120,18 @@ TomorrowNight = [
     ["#b294bb", "#b294bb"], # color06
     ["#70c0ba", "#70c0ba"]  # color15
     ]
+
+# Every palette above by name; dtos-colorscheme pre-renders each of these into a
+# theme bundle at install time.
+palettes = {
+    "DoomOne": DoomOne,
+    "Dracula": Dracula,
+    "GruvboxDark": GruvboxDark,
+    "MonokaiPro": MonokaiPro,
+    "Nord": Nord,
+    "OceanicNext": OceanicNext,
+    "Palenight": Palenight,
+    "SolarizedDark": SolarizedDark,
+    "SolarizedLight": SolarizedLight,
+    "TomorrowNight": TomorrowNight,
+}
@@ -1,8 +1,11 @@
 # -*- coding: utf-8 -*-
+import asyncio
+import importlib.util
 import json
 import os
 import socket
 import subprocess
+import time
 from pathlib import Path
 import shutil
 
@@ -17,12 +20,25 @@ from libqtile.lazy import lazy
 from libqtile.log_utils import logger
 from typing import List  # noqa: F401
 
+CONFIG_STARTED = time.monotonic()
+
 try:
     import psutil  # noqa: F401
     HAS_PSUTIL = True
 except Exception:
     HAS_PSUTIL = False
 
+try:
+    # Stage timings (config load, wal colors); installed next to the other helpers.
+    # Loaded by path so ~/.local/bin never ends up on sys.path.
+    _metrics_spec = importlib.util.spec_from_file_location(
+        "dtos_metrics", os.path.expanduser("~/.local/bin/dtos_metrics.py"))
+    dtos_metrics = importlib.util.module_from_spec(_metrics_spec)
+    _metrics_spec.loader.exec_module(dtos_metrics)
+    HAS_METRICS = True
+except (ImportError, OSError):
+    HAS_METRICS = False
+
 try:
     # Wayland-only: used to set keyboard layout without setxkbmap
     from libqtile.backend.wayland import InputConfig
@@ -54,6 +70,8 @@ def start_once():
 
 mod = "mod4"              # SUPER/WIN
 myTerm = "alacritty" if shutil.which("alacritty") else "xterm"
+# dtos-emacsd (started by autostart.sh) keeps a server warm; its client waits for one that is starting.
+myEmacs = "dtos-emacsd client" if shutil.which("dtos-emacsd") else "emacsclient -c -a 'emacs'"
 myBrowser = "firefox"
 myVirt = "virt-manager"
 myOffice = "libreoffice"
@@ -210,7 +228,74 @@ def detect_primary_interface():
     return _pick(names)
 
 
+# ---------- Shared metrics (dtos-metricsd) ----------
+
+# One daemon samples CPU, memory, network, temperature, disk and updates for
+# every bar on every screen (and for Awesome); widgets only render its pushes.
+METRICS_SOCKET = os.environ.get("DTOS_METRICS_SOCKET") or (
+    os.path.join(os.environ["XDG_RUNTIME_DIR"], "dtos-metrics.sock") if os.environ.get("XDG_RUNTIME_DIR")
+    else f"/tmp/dtos-metrics-{os.environ.get('USER', os.getuid())}.sock"
+)
+HAS_METRICSD = bool(shutil.which("dtos-metricsd"))
+
+
+def human_bytes(value, suffix="B"):
+    for unit in ("", "k", "M", "G"):
+        if abs(value) < 1024 or unit == "G":
+            return f"{value:.1f}{unit}{suffix}" if unit else f"{value:.0f}{suffix}"
+        value /= 1024
+
+
+class MetricsText(widget.TextBox):
+    """TextBox updated from dtos-metricsd pushes instead of its own timer."""
+
+    def __init__(self, keys, render, **config):
+        super().__init__(text=" ", **config)
+        self.metric_keys = keys
+        self.render = render
+        self._follow_task = None
+
+    def timer_setup(self):
+        self._follow_task = asyncio.get_event_loop().create_task(self._follow())
+
+    def finalize(self):
+        if self._follow_task:
+            self._follow_task.cancel()
+        super().finalize()
+
+    async def _follow(self):
+        while True:
+            try:
+                reader, writer = await asyncio.open_unix_connection(METRICS_SOCKET)
+                writer.write(("subscribe " + " ".join(self.metric_keys) + "\n").encode())
+                await writer.drain()
+                while line := await reader.readline():
+                    snapshot = json.loads(line)
+                    if all(key in snapshot for key in self.metric_keys):
+                        try:
+                            text = self.render(snapshot)
+                        except (KeyError, TypeError) as err:
+                            # A metric without the fields the lambda expects: keep the old text.
+                            logger.warning("dtos-metricsd %s: cannot render %r: %r", self.metric_keys, snapshot, err)
+                            continue
+                        if text != self.text:
+                            self.update(text)
+                writer.close()
+            except (OSError, ValueError) as err:
+                logger.debug("dtos-metricsd unavailable: %s", err)
+            await asyncio.sleep(5)
+
+
 def build_net_widget(foreground, background):
+    if HAS_METRICSD:
+        return MetricsText(
+            ["net"],
+            lambda m: f"Net: {human_bytes(m['net']['down'])} ↓↑ {human_bytes(m['net']['up'])}"
+            if m["net"]["iface"] else "Net: no iface",
+            foreground=foreground,
+            background=background,
+            padding=5,
+        )
     iface = detect_primary_interface()
     if HAS_PSUTIL and iface:
         return widget.Net(
@@ -225,6 +310,15 @@ def build_net_widget(foreground, background):
 
 
 def build_memory_widget(foreground, background):
+    if HAS_METRICSD:
+        return MetricsText(
+            ["mem"],
+            lambda m: f"Mem: {m['mem']['used'] / 1024 ** 3:.1f}/{m['mem']['total'] / 1024 ** 3:.1f}",
+            foreground=foreground,
+            background=background,
+            mouse_callbacks={"Button1": lambda: qtile.cmd_spawn(myTerm + " -e htop")},
+            padding=5,
+        )
     if HAS_PSUTIL:
         return widget.Memory(
             foreground=foreground,
@@ -240,6 +334,14 @@ def build_memory_widget(foreground, background):
 
 def build_temp_widget(foreground, background):
     """Show internal sensor temperature when available; degrade to text."""
+    if HAS_METRICSD:
+        return MetricsText(
+            ["temp"],
+            lambda m: "Temp: N/A" if m["temp"]["celsius"] is None else f"Temp: {m['temp']['celsius']}°C",
+            foreground=foreground,
+            background=background,
+            padding=5,
+        )
     try:
         return widget.ThermalSensor(
             foreground=foreground,
@@ -252,6 +354,28 @@ def build_temp_widget(foreground, background):
         return widget.TextBox(text="Temp: N/A", foreground=foreground, background=background, padding=5)
 
 
+def build_updates_widget(foreground, background):
+    callbacks = {"Button1": lambda: qtile.cmd_spawn(myTerm + " -e yay -Syu")}
+    if HAS_METRICSD:
+        return MetricsText(
+            ["updates"],
+            lambda m: f"Updates: {m['updates']['count']} ",
+            foreground=foreground,
+            background=background,
+            mouse_callbacks=callbacks,
+            padding=5,
+        )
+    return widget.GenPollText(
+        update_interval=1800,
+        func=total_updates_count,
+        fmt="Updates: {} ",
+        foreground=foreground,
+        background=background,
+        mouse_callbacks=callbacks,
+        padding=5,
+    )
+
+
 # Systray helper
 def build_tray_widget(background):
     """Return a tray widget or None when unavailable to avoid error placeholders."""
@@ -275,6 +399,114 @@ def build_tray_widget(background):
     else:
         return widget.Systray(background=background, padding=5)
 
+# ---------- Warm terminal pool ----------
+
+# MOD + Return hands out a terminal that was started ahead of time and parked on a
+# hidden group, so the keypress pays for a group move instead of alacritty's GPU
+# and font setup. The pool is topped up shortly after each hand-out. The parked
+# windows are the pool itself, so it survives config reloads and X11 restarts.
+# DTOS_TERM_POOL sets the pool size; 0 spawns a fresh terminal every time.
+
+
+def term_pool_size(default=1):
+    # A typo in the environment must not keep the config from loading.
+    try:
+        return max(0, int(os.environ.get("DTOS_TERM_POOL", default)))
+    except ValueError:
+        return default
+
+
+TERM_POOL_SIZE = term_pool_size()
+TERM_POOL_GROUP = "POOL"
+# Seconds to wait before refilling, so the new terminal's startup does not compete
+# with the frame of the one just handed out.
+TERM_POOL_REFILL_DELAY = 1.0
+# A spawn that has not mapped a window by then is given up on (it crashed).
+TERM_POOL_SPAWN_TIMEOUT = 15.0
+
+
+class TerminalPool:
+    """Pre-spawned terminals on a hidden group, handed out on keypress."""
+
+    def __init__(self, command, size, group):
+        self.command = command
+        self.size = size
+        self.group = group
+        self.pending = {}  # pid -> spawn time, for pool terminals not yet mapped
+        self.cold = {}  # pid -> keypress time, for terminals spawned because the pool was empty
+
+    def parked(self):
+        pool = qtile.groups_map.get(self.group)
+        return list(pool.windows) if pool else []
+
+    def fill(self):
+        if self.group not in qtile.groups_map:
+            return
+        now = time.monotonic()
+        self.pending = {pid: t for pid, t in self.pending.items() if now - t < TERM_POOL_SPAWN_TIMEOUT}
+        for _ in range(self.size - len(self.parked()) - len(self.pending)):
+            pid = qtile.cmd_spawn(self.command)
+            if pid:
+                self.pending[pid] = now
+
+    def take(self, group, pressed):
+        """Moves a parked terminal to `group`, or spawns one when the pool is empty."""
+        parked = self.parked()
+        if parked:
+            window = parked[0]
+            window.togroup(group.name)
+            group.focus(window)
+            # Recorded once the loop has flushed the move, i.e. when the window is on screen.
+            qtile.call_soon(record_terminal_frame, "pool", pressed)
+        else:
+            self.cold = {pid: t for pid, t in self.cold.items() if pressed - t < TERM_POOL_SPAWN_TIMEOUT}
+            pid = qtile.cmd_spawn(self.command)
+            if pid:
+                self.cold[pid] = pressed
+        if self.size > 0:
+            qtile.call_later(TERM_POOL_REFILL_DELAY, self.fill)
+
+    def adopt(self, window):
+        """client_new: parks the pool's own terminals and times the cold ones."""
+        if not self.pending and not self.cold:
+            return
+        try:
+            pid = window.get_pid()
+        except AttributeError:
+            # Internal windows (bars, popups) have no client pid.
+            return
+        if pid in self.pending:
+            del self.pending[pid]
+            window.togroup(self.group)
+        elif pid in self.cold:
+            # alacritty maps its window after the first frame is drawn.
+            record_terminal_frame("cold", self.cold.pop(pid))
+
+
+def record_terminal_frame(source, pressed):
+    if HAS_METRICS:
+        dtos_metrics.record("terminal_frame", time.monotonic() - pressed, source=source)
+
+
+term_pool = TerminalPool(myTerm, TERM_POOL_SIZE, TERM_POOL_GROUP)
+
+
+def spawn_terminal(qtile):
+    pressed = time.monotonic()
+    focus_group_on_screen("DEV")(qtile)
+    term_pool.take(qtile.current_group, pressed)
+
+
+@hook.subscribe.client_new
+def park_pool_terminal(window):
+    term_pool.adopt(window)
+
+
+@hook.subscribe.startup_complete
+def fill_term_pool():
+    term_pool.fill()
+
+
 # Qtile cannot restart under Wayland; reload the config there instead.
 restart_binding = lazy.reload_config() if is_wayland() else lazy.restart()
 
@@ -286,14 +518,13 @@ keys = [
     Key([mod, "shift"], "r", restart_binding,
         desc="Reload config (Wayland) / Restart Qtile (X11)"),
     Key([mod, "shift"], "q", lazy.shutdown(), desc="Shutdown Qtile"),
-    Key([mod, "shift"], "e", lazy.spawn("emacsclient -c -a emacs"), desc="Doom Emacs"),
+    Key([mod, "shift"], "e", lazy.spawn(myEmacs), desc="Doom Emacs"),
     Key([mod], "Tab", lazy.next_layout(), desc="Toggle through layouts"),
     Key([mod], "q", lazy.window.kill(), desc="Kill active window"),
 
     # My app keybindings
     Key([mod], "Return",
-        lazy.function(focus_group_on_screen("DEV")),
-        lazy.spawn(myTerm),
+        lazy.function(spawn_terminal),
         desc="Launch terminal (DEV workspace)"),
     Key([mod], "b",
         lazy.function(focus_group_on_screen("WWW")),
@@ -397,32 +628,32 @@ keys = [
     # Emacs key chord: SUPER + e then key
     KeyChord([mod], "e", [
         Key([], "e",
-            lazy.spawn("emacsclient -c -a 'emacs'"),
+            lazy.spawn(myEmacs),
             desc="Emacsclient Dashboard"),
         Key([], "a",
-            lazy.spawn("emacsclient -c -a 'emacs' --eval '(emms)' "
+            lazy.spawn(myEmacs + " --eval '(emms)' "
                        "--eval '(emms-play-directory-tree \"~/Music/\")'"),
             desc="EMMS music"),
         Key([], "b",
-            lazy.spawn("emacsclient -c -a 'emacs' --eval '(ibuffer)'"),
+            lazy.spawn(myEmacs + " --eval '(ibuffer)'"),
             desc="Emacs Ibuffer"),
         Key([], "d",
-            lazy.spawn("emacsclient -c -a 'emacs' --eval '(dired nil)'"),
+            lazy.spawn(myEmacs + " --eval '(dired nil)'"),
             desc="Emacs Dired"),
         Key([], "i",
-            lazy.spawn("emacsclient -c -a 'emacs' --eval '(erc)'"),
+            lazy.spawn(myEmacs + " --eval '(erc)'"),
             desc="Emacs ERC"),
         Key([], "n",
-            lazy.spawn("emacsclient -c -a 'emacs' --eval '(elfeed)'"),
+            lazy.spawn(myEmacs + " --eval '(elfeed)'"),
             desc="Emacs Elfeed"),
         Key([], "s",
-            lazy.spawn("emacsclient -c -a 'emacs' --eval '(eshell)'"),
+            lazy.spawn(myEmacs + " --eval '(eshell)'"),
             desc="Emacs Eshell"),
         Key([], "v",
-            lazy.spawn("emacsclient -c -a 'emacs' --eval '(+vterm/here nil)'"),
+            lazy.spawn(myEmacs + " --eval '(+vterm/here nil)'"),
             desc="Emacs Vterm"),
         Key([], "w",
-            lazy.spawn("emacsclient -c -a 'emacs' --eval "
+            lazy.spawn(myEmacs + " --eval "
                        "'(doom/window-maximize-buffer(eww \"distro.tube\"))'"),
             desc="Emacs EWW browser"),
     ]),
@@ -463,6 +694,8 @@ def build_screen_groups(screen_index):
 
 screen_groups = {index: build_screen_groups(index) for index in range(NUM_SCREENS)}
 groups = [grp for screen_list in screen_groups.values() for grp in screen_list]
+# Hidden: no GroupBox lists it and no key switches to it.
+groups.append(Group(TERM_POOL_GROUP, label=""))
 
 # Use custom bindings below instead of simple_key_binder to keep groups pinned per screen
 dgroups_key_binder = None
@@ -538,6 +771,8 @@ def load_wal_colors():
         ]
     except Exception as err:
         logger.warning("Falling back to default colors (wal load failed): %s", err)
+        if HAS_METRICS:
+            dtos_metrics.record("qtile_wal_colors", 0, False)
         return FALLBACK_COLORS
 
 
@@ -689,17 +924,7 @@ def init_widgets_list(visible_groups, include_systray=True):
         powerline(colors[3], colors[4]),
         build_temp_widget(colors[1], colors[4]),
         powerline(colors[4], colors[5]),
-        widget.GenPollText(
-            update_interval=1800,
-            func=total_updates_count,
-            fmt="Updates: {} ",
-            foreground=colors[1],
-            background=colors[5],
-            mouse_callbacks={
-                "Button1": lambda: qtile.cmd_spawn(myTerm + " -e yay -Syu")
-            },
-            padding=5,
-        ),
+        build_updates_widget(colors[1], colors[5]),
         powerline(colors[5], colors[6]),
         build_memory_widget(colors[1], colors[6]),
         powerline(colors[6], colors[7]),
@@ -784,3 +1009,6 @@ reconfigure_screens = True
 auto_minimize = True
 
 wmname = "LG3D"
+
+if HAS_METRICS:
+    dtos_metrics.record("qtile_config_load", time.monotonic() - CONFIG_STARTED)
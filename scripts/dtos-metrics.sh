@@ -0,0 +1,66 @@
+# Stage timings for shell entry points; source it, then:
+#
+#   dtos_stage_begin                    start (or restart) the stage clock
+#   dtos_stage_end STAGE [STATUS] [k=v,k=v]
+#                                       record the time since the last begin/end, then restart the clock
+#   dtos_run_end STAGE [STATUS] [k=v,k=v]
+#                                       record the time since the first begin
+#   dtos_timed STAGE [k=v,k=v] -- CMD   run CMD, record its time and exit status, return that status
+#
+# Each call appends one line to the events file that `dtos_metrics.py export` folds into
+# histograms (Prometheus textfile + JSON). POSIX sh; bash gets its clock without forking.
+# DTOS_METRICS=0 turns recording off.
+
+DTOS_METRICS_DIR="${DTOS_METRICS_DIR:-${XDG_CACHE_HOME:-$HOME/.cache}/dtos-pywal/metrics}"
+
+# Sets _dtos_now to the current time in microseconds.
+_dtos_clock() {
+    if [ -n "${EPOCHREALTIME:-}" ]; then
+        # bash only; eval keeps the substitution away from shells that cannot parse it
+        eval '_dtos_now="${EPOCHREALTIME/[.,]/}"'
+    else
+        _dtos_now="$(date +%s%6N)"
+    fi
+}
+
+dtos_metric() {
+    [ "${DTOS_METRICS:-1}" = "0" ] && return 0
+    [ -d "$DTOS_METRICS_DIR" ] || mkdir -p "$DTOS_METRICS_DIR" 2>/dev/null || return 0
+    printf '%s\t%s\t%s\t%s\n' "$1" "${4:-}" "$2" "${3:-0}" >>"$DTOS_METRICS_DIR/events" 2>/dev/null || true
+}
+
+dtos_stage_begin() {
+    _dtos_clock
+    _dtos_t0="$_dtos_now"
+    _dtos_run0="${_dtos_run0:-$_dtos_now}"
+}
+
+dtos_stage_end() {
+    _dtos_clock
+    dtos_metric "$1" "$((_dtos_now - ${_dtos_t0:-$_dtos_now}))" "${2:-0}" "${3:-}"
+    _dtos_t0="$_dtos_now"
+}
+
+dtos_timed() {
+    _dtos_stage="$1"
+    shift
+    _dtos_labels=""
+    if [ "${1:-}" != "--" ]; then
+        _dtos_labels="${1:-}"
+        shift
+    fi
+    [ "${1:-}" = "--" ] && shift
+    _dtos_clock
+    _dtos_start="$_dtos_now"
+    _dtos_status=0
+    "$@" || _dtos_status=$?
+    _dtos_clock
+    dtos_metric "$_dtos_stage" "$((_dtos_now - _dtos_start))" "$_dtos_status" "$_dtos_labels"
+    return "$_dtos_status"
+}
+
+# Records the time since the first dtos_stage_begin, e.g. a whole script run.
+dtos_run_end() {
+    _dtos_clock
+    dtos_metric "$1" "$((_dtos_now - ${_dtos_run0:-$_dtos_now}))" "${2:-0}" "${3:-}"
+}
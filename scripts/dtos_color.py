@@ -0,0 +1,323 @@
+#!/usr/bin/env python3
+"""Shared color math for the theme scripts: sRGB/CIELAB, ΔE2000 and the accent table.
+
+Conversions work on whole batches with NumPy (hex -> sRGB -> linear -> XYZ ->
+CIELAB, D65). The questions the pipeline asks on every wal run -- which
+palette color is the accent, and which Papirus folder color is closest to it
+-- are answered from a precomputed table instead: every RGB color quantized
+to 6 bits per channel, with its CIELAB chroma and its nearest Papirus color by
+ΔE2000. The table is built once with NumPy and memory-mapped afterwards, so a
+lookup is one indexed read and needs neither NumPy nor any math at run time.
+
+Import it from scripts that sit next to it in ~/.local/bin, or run it:
+
+Usage:
+  dtos_color.py accent [COLORS_JSON]     most chromatic palette color (default ~/.cache/wal/colors.json)
+  dtos_color.py papirus [COLORS_JSON]    Papirus folder color for that accent
+  dtos_color.py build                    (re)build the lookup table
+  dtos_color.py bench [-n PALETTES]      table vs. NumPy ΔE2000 vs. the old postrun code
+"""
+import argparse
+import hashlib
+import json
+import mmap
+import os
+import sys
+import time
+from pathlib import Path
+
+WAL_JSON = Path.home() / ".cache" / "wal" / "colors.json"
+CACHE_DIR = Path.home() / ".cache" / "dtos-pywal"
+
+# papirus-folders -C names and the color each one stands for.
+PAPIRUS_COLORS = {
+    "blue": "#2196f3",
+    "cyan": "#00bcd4",
+    "teal": "#009688",
+    "green": "#4caf50",
+    "yellow": "#ffeb3b",
+    "orange": "#ff9800",
+    "deeporange": "#ff5722",
+    "red": "#f44336",
+    "pink": "#e91e63",
+    "magenta": "#ba68c8",
+    "violet": "#673ab7",
+    "indigo": "#3f51b5",
+    "bluegrey": "#607d8b",
+    "nordic": "#88c0d0",
+    "brown": "#795548",
+    "palebrown": "#a1887f",
+    "paleorange": "#ffb74d",
+    "breeze": "#3daee9",
+    "carmine": "#ad1457",
+    "yaru": "#e95420",
+    "grey": "#9e9e9e",
+    "white": "#eeeeee",
+    "black": "#263238",
+}
+PAPIRUS_NAMES = list(PAPIRUS_COLORS)
+
+WAL_KEYS = [f"color{i}" for i in range(16)]
+
+LUT_BITS = 6
+LUT_SIZE = 1 << (3 * LUT_BITS)
+# Two planes of LUT_SIZE bytes: index into PAPIRUS_NAMES, then CIELAB chroma (C*ab, rounded).
+LUT_FILE = CACHE_DIR / "color-lut-{}.bin".format(
+    hashlib.sha1(json.dumps([LUT_BITS, PAPIRUS_COLORS]).encode()).hexdigest()[:10])
+
+# sRGB (D65) -> XYZ, and the D65 white point.
+SRGB_TO_XYZ = (
+    (0.4124564, 0.3575761, 0.1804375),
+    (0.2126729, 0.7151522, 0.0721750),
+    (0.0193339, 0.1191920, 0.9503041),
+)
+WHITE_D65 = (0.95047, 1.0, 1.08883)
+
+
+def hex_to_rgb(value):
+    """'#rrggbb' (alpha and case ignored) -> (r, g, b) ints."""
+    value = value.lstrip("#")
+    return int(value[0:2], 16), int(value[2:4], 16), int(value[4:6], 16)
+
+
+# ---------- batched conversions (NumPy) ----------
+
+def _np():
+    import numpy as np
+    return np
+
+
+def hex_to_srgb(values):
+    """Hex strings -> (n, 3) float array in 0..1."""
+    np = _np()
+    return np.array([hex_to_rgb(v) for v in values], dtype=np.float64) / 255.0
+
+
+def srgb_to_linear(rgb):
+    np = _np()
+    rgb = np.asarray(rgb, dtype=np.float64)
+    return np.where(rgb <= 0.04045, rgb / 12.92, ((rgb + 0.055) / 1.055) ** 2.4)
+
+
+def linear_to_lab(linear):
+    np = _np()
+    xyz = np.asarray(linear, dtype=np.float64) @ np.array(SRGB_TO_XYZ).T / np.array(WHITE_D65)
+    eps, kappa = 216 / 24389, 24389 / 27
+    f = np.where(xyz > eps, np.cbrt(xyz), (kappa * xyz + 16) / 116)
+    return np.stack([116 * f[..., 1] - 16, 500 * (f[..., 0] - f[..., 1]), 200 * (f[..., 1] - f[..., 2])], axis=-1)
+
+
+def srgb_to_lab(rgb):
+    return linear_to_lab(srgb_to_linear(rgb))
+
+
+def hex_to_lab(values):
+    return srgb_to_lab(hex_to_srgb(values))
+
+
+def chroma(lab):
+    np = _np()
+    return np.hypot(lab[..., 1], lab[..., 2])
+
+
+def delta_e2000(lab1, lab2):
+    """CIEDE2000 between broadcastable (..., 3) CIELAB arrays (Sharma, Wu & Dalal 2005)."""
+    np = _np()
+    lab1 = np.asarray(lab1, dtype=np.float64)
+    lab2 = np.asarray(lab2, dtype=np.float64)
+    L1, a1, b1 = lab1[..., 0], lab1[..., 1], lab1[..., 2]
+    L2, a2, b2 = lab2[..., 0], lab2[..., 1], lab2[..., 2]
+
+    c_bar = (np.hypot(a1, b1) + np.hypot(a2, b2)) / 2
+    g = 0.5 * (1 - np.sqrt(c_bar ** 7 / (c_bar ** 7 + 25.0 ** 7)))
+    a1p, a2p = (1 + g) * a1, (1 + g) * a2
+    c1p, c2p = np.hypot(a1p, b1), np.hypot(a2p, b2)
+    h1p = np.degrees(np.arctan2(b1, a1p)) % 360
+    h2p = np.degrees(np.arctan2(b2, a2p)) % 360
+
+    dL = L2 - L1
+    dC = c2p - c1p
+    dh = h2p - h1p
+    dh = np.where(dh > 180, dh - 360, np.where(dh < -180, dh + 360, dh))
+    dh = np.where(c1p * c2p == 0, 0, dh)
+    dH = 2 * np.sqrt(c1p * c2p) * np.sin(np.radians(dh / 2))
+
+    L_bar = (L1 + L2) / 2
+    cp_bar = (c1p + c2p) / 2
+    h_sum = h1p + h2p
+    h_bar = np.where(np.abs(h1p - h2p) > 180, np.where(h_sum < 360, h_sum + 360, h_sum - 360), h_sum) / 2
+    h_bar = np.where(c1p * c2p == 0, h_sum, h_bar)
+
+    t = (1 - 0.17 * np.cos(np.radians(h_bar - 30)) + 0.24 * np.cos(np.radians(2 * h_bar))
+         + 0.32 * np.cos(np.radians(3 * h_bar + 6)) - 0.20 * np.cos(np.radians(4 * h_bar - 63)))
+    s_l = 1 + 0.015 * (L_bar - 50) ** 2 / np.sqrt(20 + (L_bar - 50) ** 2)
+    s_c = 1 + 0.045 * cp_bar
+    s_h = 1 + 0.015 * cp_bar * t
+    r_t = (-2 * np.sqrt(cp_bar ** 7 / (cp_bar ** 7 + 25.0 ** 7))
+           * np.sin(np.radians(60 * np.exp(-(((h_bar - 275) / 25) ** 2)))))
+    return np.sqrt((dL / s_l) ** 2 + (dC / s_c) ** 2 + (dH / s_h) ** 2 + r_t * (dC / s_c) * (dH / s_h))
+
+
+def nearest_papirus(lab):
+    """Index into PAPIRUS_NAMES of the closest Papirus color for each CIELAB row."""
+    targets = hex_to_lab(PAPIRUS_COLORS.values())
+    return delta_e2000(lab[..., None, :], targets).argmin(axis=-1)
+
+
+# ---------- lookup table ----------
+
+def lut_index(r, g, b):
+    shift = 8 - LUT_BITS
+    return ((r >> shift) << (2 * LUT_BITS)) | ((g >> shift) << LUT_BITS) | (b >> shift)
+
+
+def build_lut(path=LUT_FILE, chunk=1 << 15):
+    """Computes both planes for the center of every quantized RGB cell and writes them atomically."""
+    np = _np()
+    steps = 1 << LUT_BITS
+    levels = (np.arange(steps) * (256 // steps) + (256 // steps - 1) / 2) / 255.0
+    cells = np.stack(np.meshgrid(levels, levels, levels, indexing="ij"), axis=-1).reshape(-1, 3)
+    names = np.empty(LUT_SIZE, dtype=np.uint8)
+    chromas = np.empty(LUT_SIZE, dtype=np.uint8)
+    for start in range(0, LUT_SIZE, chunk):
+        lab = srgb_to_lab(cells[start:start + chunk])
+        names[start:start + chunk] = nearest_papirus(lab)
+        chromas[start:start + chunk] = np.clip(np.rint(chroma(lab)), 0, 255)
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}")
+    with open(tmp, "wb") as f:
+        f.write(names.tobytes())
+        f.write(chromas.tobytes())
+    os.replace(tmp, path)
+    return path
+
+
+class ColorTable:
+    """The memory-mapped lookup table; built on first use if it is missing."""
+
+    def __init__(self, path=LUT_FILE):
+        if not path.is_file() or path.stat().st_size != 2 * LUT_SIZE:
+            build_lut(path)
+        with open(path, "rb") as f:
+            self.map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def papirus(self, value):
+        """Papirus folder color nearest to a hex color."""
+        return PAPIRUS_NAMES[self.map[lut_index(*hex_to_rgb(value))]]
+
+    def chroma(self, value):
+        return self.map[LUT_SIZE + lut_index(*hex_to_rgb(value))]
+
+    def accent(self, colors):
+        """The most chromatic of a wal `colors` dict; ties go to the lowest colorN."""
+        values = [value for value in map(colors.get, WAL_KEYS) if value and value.startswith("#")]
+        return max(values, key=self.chroma) if values else None
+
+
+_table = None
+
+
+def table():
+    global _table
+    if _table is None:
+        _table = ColorTable()
+    return _table
+
+
+def wal_colors(path=WAL_JSON):
+    try:
+        return json.loads(Path(path).read_text()).get("colors", {})
+    except (OSError, ValueError):
+        return {}
+
+
+def accent(colors):
+    return table().accent(colors)
+
+
+def papirus(value):
+    return table().papirus(value)
+
+
+# ---------- benchmark ----------
+
+def _legacy_papirus(colors):
+    """The per-call code wal/postrun used: HLS saturation pick, RGB Euclidean match."""
+    import colorsys
+    import math
+
+    def saturation(value):
+        r, g, b = [c / 255.0 for c in hex_to_rgb(value)]
+        return colorsys.rgb_to_hls(r, g, b)[2]
+
+    palette = [c for _, c in sorted(colors.items()) if c and c.startswith("#")]
+    accent_hex = max(palette, key=saturation)
+
+    def distance(c1, c2):
+        r1, g1, b1 = hex_to_rgb(c1)
+        r2, g2, b2 = hex_to_rgb(c2)
+        return math.sqrt((r1 - r2) ** 2 + (g1 - g2) ** 2 + (b1 - b2) ** 2)
+
+    return min(PAPIRUS_COLORS.items(), key=lambda kv: distance(accent_hex, kv[1]))[0]
+
+
+def bench(count):
+    np = _np()
+    rng = np.random.default_rng(0)
+    palettes = [{f"color{i}": "#%02x%02x%02x" % tuple(rgb) for i, rgb in enumerate(rng.integers(0, 256, (16, 3)))}
+                for _ in range(count)]
+
+    start = time.perf_counter()
+    build_lut()
+    print(f"build table:    {(time.perf_counter() - start) * 1000:8.1f} ms ({2 * LUT_SIZE // 1024} KiB)")
+
+    start = time.perf_counter()
+    lut = ColorTable()
+    print(f"open table:     {(time.perf_counter() - start) * 1e6:8.1f} us")
+
+    start = time.perf_counter()
+    legacy = [_legacy_papirus(p) for p in palettes]
+    legacy_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    fast = [lut.papirus(lut.accent(p)) for p in palettes]
+    fast_s = time.perf_counter() - start
+
+    start = time.perf_counter()
+    lab = hex_to_lab([p[key] for p in palettes for key in WAL_KEYS]).reshape(count, 16, 3)
+    accent_lab = lab[np.arange(count), chroma(lab).argmax(axis=1)]
+    exact = [PAPIRUS_NAMES[i] for i in nearest_papirus(accent_lab)]
+    exact_s = time.perf_counter() - start
+
+    agree = sum(a == b for a, b in zip(fast, exact)) / count * 100
+    changed = sum(a != b for a, b in zip(fast, legacy)) / count * 100
+    print(f"old postrun:    {legacy_s / count * 1e6:8.1f} us/palette")
+    print(f"table lookup:   {fast_s / count * 1e6:8.1f} us/palette")
+    print(f"NumPy ΔE2000:   {exact_s / count * 1e6:8.1f} us/palette (batched)")
+    print(f"table vs exact ΔE2000: {agree:.1f}% agree; "
+          f"differs from the old pick on {changed:.1f}% of palettes")
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="dtos_color.py", description=__doc__.splitlines()[0])
+    parser.add_argument("action", choices=["accent", "papirus", "build", "bench"])
+    parser.add_argument("colors_json", nargs="?", default=str(WAL_JSON))
+    parser.add_argument("-n", "--palettes", type=int, default=2000, help="random palettes for bench")
+    args = parser.parse_args(argv)
+
+    if args.action == "build":
+        print(build_lut())
+        return 0
+    if args.action == "bench":
+        bench(args.palettes)
+        return 0
+    value = accent(wal_colors(args.colors_json))
+    if not value:
+        print(f"dtos_color.py: no palette in {args.colors_json}", file=sys.stderr)
+        return 1
+    print(value if args.action == "accent" else papirus(value))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,258 @@
+#!/usr/bin/env python3
+"""Stage timings for the theme pipeline and the launchers, as Prometheus and JSON.
+
+Entry points append one line per finished stage to an events file (the shell
+ones through dtos-metrics.sh, Python through record() or timer()); appending
+is all they pay. `dtos_metrics.py export` folds the new events into
+per-stage histograms kept in state.json, then writes a Prometheus textfile
+(for node_exporter's textfile collector) and a JSON snapshot for local
+dashboards. wal/postrun exports in the background after every run.
+
+Event lines are tab-separated: stage, labels (k=v,k=v), microseconds, exit
+status (0 is success).
+
+Usage:
+  dtos_metrics.py record STAGE SECONDS [k=v ...] [--status N]
+  dtos_metrics.py time STAGE [k=v ...] -- COMMAND ...   run COMMAND and record it
+  dtos_metrics.py export                                 fold events, write the exports
+  dtos_metrics.py show                                   export, then print a summary
+
+Environment: DTOS_METRICS=0 disables recording, DTOS_METRICS_DIR moves the
+state (default ~/.cache/dtos-pywal/metrics), DTOS_METRICS_TEXTFILE sets the
+Prometheus file (default DTOS_METRICS_DIR/dtos.prom).
+"""
+import argparse
+import fcntl
+import json
+import os
+import subprocess
+import sys
+import time
+from contextlib import contextmanager
+from pathlib import Path
+
+CACHE_HOME = Path(os.environ.get("XDG_CACHE_HOME") or Path.home() / ".cache")
+METRICS_DIR = Path(os.environ.get("DTOS_METRICS_DIR") or CACHE_HOME / "dtos-pywal" / "metrics")
+EVENTS_FILE = METRICS_DIR / "events"
+STATE_FILE = METRICS_DIR / "state.json"
+JSON_FILE = METRICS_DIR / "metrics.json"
+PROM_FILE = Path(os.environ.get("DTOS_METRICS_TEXTFILE") or METRICS_DIR / "dtos.prom")
+LOCK_FILE = METRICS_DIR / ".lock"
+ENABLED = os.environ.get("DTOS_METRICS", "1") != "0"
+
+# Histogram upper bounds in seconds; the last bucket is +Inf.
+BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+
+def format_labels(labels):
+    return ",".join(f"{key}={value}" for key, value in sorted(labels.items()))
+
+
+def record(stage, seconds, ok=True, **labels):
+    """Appends one finished stage; never raises."""
+    if not ENABLED:
+        return
+    line = f"{stage}\t{format_labels(labels)}\t{int(seconds * 1e6)}\t{0 if ok else 1}\n"
+    try:
+        fd = os.open(EVENTS_FILE, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+    except FileNotFoundError:
+        try:
+            METRICS_DIR.mkdir(parents=True, exist_ok=True)
+            fd = os.open(EVENTS_FILE, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        except OSError:
+            return
+    except OSError:
+        return
+    try:
+        # One write() on an O_APPEND file, so concurrent writers never interleave a line.
+        os.write(fd, line.encode())
+    except OSError:
+        pass
+    finally:
+        os.close(fd)
+
+
+@contextmanager
+def timer(stage, **labels):
+    """Times the block; an exception records a failure and is re-raised."""
+    start = time.monotonic()
+    ok = False
+    try:
+        yield
+        ok = True
+    finally:
+        record(stage, time.monotonic() - start, ok, **labels)
+
+
+def parse_labels(text):
+    return dict(item.split("=", 1) for item in text.split(",") if "=" in item)
+
+
+def fold(state, lines):
+    """Adds event lines to state: {"stage|labels": {stage, labels, count, sum, failures, max, last, buckets}}."""
+    now = time.time()
+    for line in lines:
+        fields = line.rstrip("\n").split("\t")
+        if len(fields) != 4:
+            continue
+        stage, labels, micros, status = fields
+        try:
+            seconds = int(micros) / 1e6
+            failed = int(status) != 0
+        except ValueError:
+            continue
+        series = state.setdefault(f"{stage}|{labels}", {
+            "stage": stage, "labels": parse_labels(labels), "count": 0, "sum": 0.0, "failures": 0,
+            "max": 0.0, "last": 0.0, "updated": 0.0, "buckets": [0] * (len(BUCKETS) + 1),
+        })
+        series["count"] += 1
+        series["sum"] += seconds
+        series["failures"] += failed
+        series["max"] = max(series["max"], seconds)
+        series["last"] = seconds
+        series["updated"] = now
+        series["buckets"][next((i for i, le in enumerate(BUCKETS) if seconds <= le), len(BUCKETS))] += 1
+    return state
+
+
+def quantile(series, q):
+    """Upper bound of the bucket holding the q-quantile (what histogram_quantile would interpolate)."""
+    target = q * series["count"]
+    seen = 0
+    for i, count in enumerate(series["buckets"]):
+        seen += count
+        if seen >= target and count:
+            return BUCKETS[i] if i < len(BUCKETS) else series["max"]
+    return 0.0
+
+
+def escape_label(value):
+    """Label value as the Prometheus text format wants it: backslash, quote and newline escaped."""
+    return str(value).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+
+
+def prometheus(state):
+    def labels(series, extra=""):
+        items = [f'stage="{escape_label(series["stage"])}"']
+        items += [f'{k}="{escape_label(v)}"' for k, v in sorted(series["labels"].items())]
+        return "{" + ",".join(items + ([extra] if extra else [])) + "}"
+
+    out = ["# HELP dtos_stage_duration_seconds Duration of DTOS theme pipeline and launcher stages.",
+           "# TYPE dtos_stage_duration_seconds histogram"]
+    for series in state.values():
+        cumulative = 0
+        for le, count in zip([*map(str, BUCKETS), "+Inf"], series["buckets"]):
+            cumulative += count
+            bound = 'le="' + le + '"'
+            out.append(f"dtos_stage_duration_seconds_bucket{labels(series, bound)} {cumulative}")
+        out.append(f"dtos_stage_duration_seconds_sum{labels(series)} {series['sum']:.6f}")
+        out.append(f"dtos_stage_duration_seconds_count{labels(series)} {series['count']}")
+    out += ["# HELP dtos_stage_failures_total Stages that exited with an error.",
+            "# TYPE dtos_stage_failures_total counter"]
+    out += [f"dtos_stage_failures_total{labels(series)} {series['failures']}" for series in state.values()]
+    out += ["# HELP dtos_stage_last_seconds Duration of the most recent run of each stage.",
+            "# TYPE dtos_stage_last_seconds gauge"]
+    out += [f"dtos_stage_last_seconds{labels(series)} {series['last']:.6f}" for series in state.values()]
+    return "\n".join(out) + "\n"
+
+
+def snapshot(state):
+    return {
+        "generated": time.time(),
+        "buckets": list(BUCKETS),
+        "stages": [
+            {**series, "mean": series["sum"] / series["count"] if series["count"] else 0.0,
+             "p50": quantile(series, 0.5), "p95": quantile(series, 0.95)}
+            for series in sorted(state.values(), key=lambda s: (s["stage"], format_labels(s["labels"])))
+        ],
+    }
+
+
+def write_atomic(path, data):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}")
+    tmp.write_text(data)
+    os.replace(tmp, path)
+
+
+def export():
+    """Folds pending events into state.json and rewrites both exports; returns the state."""
+    METRICS_DIR.mkdir(parents=True, exist_ok=True)
+    with open(LOCK_FILE, "w") as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        try:
+            state = json.loads(STATE_FILE.read_text())
+        except (OSError, ValueError):
+            state = {}
+        # Writers open the events file by name for every line, so after the rename new
+        # events start a fresh file and only the claimed ones are folded.
+        claimed = EVENTS_FILE.with_name(f"events.{os.getpid()}")
+        try:
+            os.replace(EVENTS_FILE, claimed)
+        except FileNotFoundError:
+            claimed = None
+        if claimed:
+            with open(claimed) as f:
+                fold(state, f)
+            write_atomic(STATE_FILE, json.dumps(state))
+            claimed.unlink()
+        write_atomic(PROM_FILE, prometheus(state))
+        write_atomic(JSON_FILE, json.dumps(snapshot(state), indent=1) + "\n")
+    return state
+
+
+def show(state):
+    if not state:
+        print("no stages recorded yet")
+        return
+    rows = snapshot(state)["stages"]
+    width = max(len(row["stage"] + format_labels(row["labels"])) for row in rows) + 3
+    print(f"{'stage':<{width}} {'count':>6} {'fail':>5} {'mean':>9} {'p50<=':>8} {'p95<=':>8} {'max':>9}")
+    for row in rows:
+        name = row["stage"] + (f"{{{format_labels(row['labels'])}}}" if row["labels"] else "")
+        print(f"{name:<{width}} {row['count']:>6} {row['failures']:>5} {row['mean'] * 1000:>7.1f}ms "
+              f"{fmt(row['p50']):>8} {fmt(row['p95']):>8} {row['max'] * 1000:>7.1f}ms")
+
+
+def fmt(seconds):
+    return f"{seconds * 1000:.0f}ms" if seconds < 1 else f"{seconds:g}s"
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="dtos_metrics.py", description=__doc__.splitlines()[0])
+    sub = parser.add_subparsers(dest="action", required=True)
+    rec = sub.add_parser("record")
+    rec.add_argument("stage")
+    rec.add_argument("seconds", type=float)
+    rec.add_argument("--status", type=int, default=0)
+    rec.add_argument("labels", nargs="*", metavar="k=v")
+    timed = sub.add_parser("time")
+    timed.add_argument("stage")
+    timed.add_argument("rest", nargs=argparse.REMAINDER, metavar="[k=v ...] -- COMMAND")
+    sub.add_parser("export")
+    sub.add_parser("show")
+    args = parser.parse_args(argv)
+
+    if args.action == "record":
+        record(args.stage, args.seconds, args.status == 0, **parse_labels(",".join(args.labels)))
+        return 0
+    if args.action == "time":
+        if "--" not in args.rest or args.rest.index("--") == len(args.rest) - 1:
+            parser.error("time needs -- COMMAND")
+        split = args.rest.index("--")
+        start = time.monotonic()
+        try:
+            status = subprocess.run(args.rest[split + 1:], check=False).returncode
+        except OSError as err:
+            print(f"dtos_metrics.py: {err}", file=sys.stderr)
+            status = 127
+        record(args.stage, time.monotonic() - start, status == 0, **parse_labels(",".join(args.rest[:split])))
+        return status
+    state = export()
+    if args.action == "show":
+        show(state)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,188 @@
+#!/usr/bin/env python3
+"""Render every theme template from one palette, rewriting only the files that change.
+
+Templates use pywal's syntax ({color4}, {color4.strip}, {color4.rgb}, {{ and
+}} for literal braces) plus role names shared by all of them: accent,
+background_alt, negative, positive, neutral and visited, picked from the
+palette the way wal/postrun always has. Each template is compiled once per
+process and rendered once; every target is written through a temp file and a
+rename, and only when its bytes differ, so alacritty's live reload, dunst and
+KDE only see a change when there is one.
+
+Templates come from ~/.config/wal/dtos-templates (colors-gtk.css from
+~/.config/wal/templates, which pywal renders as well), falling back to the
+copies next to this checkout. Import it from scripts that sit next to it in
+~/.local/bin, or run it:
+
+Usage:
+  dtos_render.py [COLORS_JSON] [--only NAME ...]   render, print the templates whose targets changed
+  dtos_render.py --list                            templates and their targets
+"""
+import argparse
+import json
+import os
+import re
+import sys
+from pathlib import Path
+
+HOME = Path.home()
+WAL_JSON = HOME / ".cache" / "wal" / "colors.json"
+RENDER_DIR = HOME / ".cache" / "dtos-pywal" / "render"
+_CHECKOUT = Path(__file__).resolve().parent.parent / "wal"
+TEMPLATE_DIRS = [HOME / ".config" / "wal" / "dtos-templates", HOME / ".config" / "wal" / "templates",
+                 _CHECKOUT / "dtos-templates", _CHECKOUT / "templates"]
+
+# Template name -> where it is rendered to.
+TARGETS = {
+    "colors-gtk.css": [HOME / ".cache" / "wal" / "colors-gtk.css"],
+    "gtk.css": [HOME / ".config" / "gtk-3.0" / "gtk.css", HOME / ".config" / "gtk-4.0" / "gtk.css"],
+    "Wal.colors": [HOME / ".local" / "share" / "color-schemes" / "Wal.colors"],
+    "alacritty.toml": [RENDER_DIR / "alacritty.toml"],
+    "colors.Xresources": [RENDER_DIR / "colors.Xresources"],
+    "dunstrc": [HOME / ".config" / "dunst" / "dunstrc.d" / "90-wal.conf"],
+}
+
+FIELD = re.compile(r"\{\{|\}\}|\{([A-Za-z_][A-Za-z0-9_]*)(?:\.([a-z]+))?\}")
+MODIFIERS = {
+    None: lambda value: value,
+    "strip": lambda value: value.lstrip("#"),
+    "rgb": lambda value: ",".join(str(int(value.lstrip("#")[i:i + 2], 16)) for i in (0, 2, 4)),
+}
+
+_compiled = {}
+
+
+def palette(data):
+    """Template values from wal's colors.json data (special + color0..15) and the shared roles."""
+    colors = {key: value for key, value in data.get("colors", {}).items() if value}
+    special = data.get("special", {})
+    background = special.get("background") or colors.get("color0", "#000000")
+    foreground = special.get("foreground") or colors.get("color7", "#ffffff")
+    accent = colors.get("color4") or colors.get("color2") or foreground
+    return {
+        "wallpaper": data.get("wallpaper", ""),
+        "alpha": str(data.get("alpha", "100")),
+        **colors,
+        "background": background,
+        "foreground": foreground,
+        "cursor": special.get("cursor") or foreground,
+        "accent": accent,
+        "background_alt": colors.get("color1", background),
+        "negative": colors.get("color1", "#ff5555"),
+        "positive": colors.get("color2", "#50fa7b"),
+        "neutral": colors.get("color3", accent),
+        "visited": colors.get("color5", accent),
+    }
+
+
+def compile_template(text):
+    """Literal strings and (name, modifier) fields, in order."""
+    parts, pos = [], 0
+    for match in FIELD.finditer(text):
+        parts.append(text[pos:match.start()])
+        token = match.group(0)
+        if token in ("{{", "}}"):
+            parts.append(token[0])
+        elif match.group(2) not in MODIFIERS:
+            raise ValueError(f"unknown modifier in {token}")
+        else:
+            parts.append((match.group(1), match.group(2)))
+        pos = match.end()
+    parts.append(text[pos:])
+    return [part for part in parts if part != ""]
+
+
+def template_path(name):
+    for folder in TEMPLATE_DIRS:
+        if (folder / name).is_file():
+            return folder / name
+    return None
+
+
+def template(name):
+    """The compiled template, compiled once per process (and again only if the file changed)."""
+    path = template_path(name)
+    if path is None:
+        raise FileNotFoundError(f"no template named {name}")
+    stamp = path.stat().st_mtime_ns
+    cached = _compiled.get(name)
+    if cached and cached[0] == (path, stamp):
+        return cached[1]
+    try:
+        parts = compile_template(path.read_text())
+    except ValueError as err:
+        raise ValueError(f"{path}: {err}") from None
+    _compiled[name] = ((path, stamp), parts)
+    return parts
+
+
+def render(name, values):
+    out = []
+    for part in template(name):
+        if isinstance(part, str):
+            out.append(part)
+            continue
+        field, modifier = part
+        if field not in values:
+            raise KeyError(f"{name}: no palette value named {field}")
+        out.append(MODIFIERS[modifier](values[field]))
+    return "".join(out)
+
+
+def write_if_changed(path, data):
+    """Writes through a temp file and a rename, only when the bytes differ; returns whether it wrote."""
+    # Resolve links so a symlinked config is updated, not replaced by a plain file.
+    path = Path(os.path.realpath(path))
+    encoded = data.encode()
+    try:
+        if path.read_bytes() == encoded:
+            return False
+    except OSError:
+        path.parent.mkdir(parents=True, exist_ok=True)
+    tmp = path.with_name(f".{path.name}.{os.getpid()}")
+    tmp.write_bytes(encoded)
+    os.replace(tmp, path)
+    return True
+
+
+def render_all(data, only=None):
+    """Renders every template (or those in `only`) from colors.json data; returns the names whose targets changed."""
+    values = palette(data)
+    changed = []
+    for name, targets in TARGETS.items():
+        if only and name not in only:
+            continue
+        if template_path(name) is None:
+            continue
+        text = render(name, values)
+        wrote = [write_if_changed(target, text) for target in targets]
+        if any(wrote):
+            changed.append(name)
+    return changed
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog="dtos_render.py", description=__doc__.splitlines()[0])
+    parser.add_argument("colors_json", nargs="?", default=str(WAL_JSON))
+    parser.add_argument("--only", nargs="+", metavar="NAME", choices=list(TARGETS))
+    parser.add_argument("--list", action="store_true", help="print templates and targets")
+    args = parser.parse_args(argv)
+
+    if args.list:
+        for name, targets in TARGETS.items():
+            source = template_path(name)
+            print(f"{name}: {source or '(no template)'} -> {', '.join(map(str, targets))}")
+        return 0
+    try:
+        data = json.loads(Path(args.colors_json).read_text())
+        changed = render_all(data, args.only)
+    except (OSError, ValueError, KeyError) as err:
+        print(f"dtos_render.py: {err}", file=sys.stderr)
+        return 1
+    for name in changed:
+        print(name)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
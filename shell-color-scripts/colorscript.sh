@@ -11,18 +11,75 @@ else
     fi
 fi
 
-if command -v find &>/dev/null; then
-    LS_CMD="$(command -v find) ${DIR_COLORSCRIPTS} -maxdepth 1 -type f"
-    LS_CMD_B="$(command -v find) ${DIR_COLORSCRIPTS}/blacklisted -maxdepth 1 -type f"
-else
-    LS_CMD="$(command -v ls) ${DIR_COLORSCRIPTS}"
-    LS_CMD_B="$(command -v ls) ${DIR_COLORSCRIPTS}/blacklisted"
+# Rendered output is cached per terminal type, so `colorscript random` in a
+# shell rc is one `cat` of bytes that are already computed. COLORSCRIPT_CACHE=0
+# (or DEV mode) runs the scripts directly as before.
+CACHE_COLORSCRIPTS="${XDG_CACHE_HOME:-$HOME/.cache}/shell-color-scripts"
+if [[ "$DEV" -gt 0 || "${COLORSCRIPT_CACHE:-1}" == 0 ]]; then
+    CACHE_COLORSCRIPTS=""
 fi
+# The output only depends on what tput and the escape codes resolve to, i.e. the terminal type and color depth.
+CACHE_RENDER="${CACHE_COLORSCRIPTS}/render/${DIR_COLORSCRIPTS//\//%}/${TERM:-dumb}-${COLORTERM:-none}"
+INDEX_COLORSCRIPTS="${CACHE_COLORSCRIPTS}/index-${DIR_COLORSCRIPTS//\//%}"
+
+# Fills list_colorscripts with the script names, sorted. The list is kept in an
+# index file that is rebuilt when the directory changes (scripts added, removed
+# or blacklisted); it is a glob when there is no cache, never find/xargs/nl.
+function _load_index() {
+    local s
+    list_colorscripts=()
+    if [[ -n "$CACHE_COLORSCRIPTS" && -f "$INDEX_COLORSCRIPTS" && "$INDEX_COLORSCRIPTS" -nt "$DIR_COLORSCRIPTS" ]]; then
+        mapfile -t list_colorscripts <"$INDEX_COLORSCRIPTS"
+        # An index written for an empty directory by older versions holds one blank line.
+        [[ "${#list_colorscripts[@]}" -eq 1 && -z "${list_colorscripts[0]}" ]] && list_colorscripts=()
+    else
+        for s in "$DIR_COLORSCRIPTS"/*; do
+            [[ -f "$s" ]] && list_colorscripts+=("${s##*/}")
+        done
+        if [[ -n "$CACHE_COLORSCRIPTS" ]] && mkdir -p "$CACHE_COLORSCRIPTS" 2>/dev/null; then
+            printf '%s' "${list_colorscripts[@]/%/$'\n'}" >"$INDEX_COLORSCRIPTS.$$" &&
+                mv -f "$INDEX_COLORSCRIPTS.$$" "$INDEX_COLORSCRIPTS"
+        fi
+    fi
+    length_colorscripts="${#list_colorscripts[@]}"
+}
+
+function _load_blacklist() {
+    local s
+    list_blacklist=()
+    for s in "$DIR_COLORSCRIPTS"/blacklisted/*; do
+        [[ -f "$s" ]] && list_blacklist+=("${s##*/}")
+    done
+    length_blacklist="${#list_blacklist[@]}"
+}
+
+# Prints names numbered like `nl`.
+function _numbered() {
+    local i
+    for ((i = 1; i <= $#; i++)); do
+        printf '%6d\t%s\n' "$i" "${!i}"
+    done
+}
+
+# Writes the output of script $1 into the render cache unless the cached copy
+# is newer than the script; returns 1 if there is no usable cache.
+function _render() {
+    local script="${DIR_COLORSCRIPTS}/$1" cached="${CACHE_RENDER}/$1"
+    [[ -n "$CACHE_COLORSCRIPTS" ]] || return 1
+    [[ -f "$cached" && "$cached" -nt "$script" ]] && return 0
+    mkdir -p "$CACHE_RENDER" 2>/dev/null || return 1
+    "$script" >"$cached.$$" 2>/dev/null && mv -f "$cached.$$" "$cached" && return 0
+    rm -f "$cached.$$"
+    return 1
+}
 
-list_colorscripts="$($LS_CMD | xargs -I $ basename $ | cut -d ' ' -f 1 | nl)"
-length_colorscripts="$($LS_CMD | wc -l)"
-list_blacklist="$($LS_CMD_B 2>/dev/null | xargs -I $ basename $ | cut -d ' ' -f 1 | nl || true)"
-length_blacklist="$($LS_CMD_B 2>/dev/null | wc -l || 0)"
+# Replaces the shell with the cached output of script $1, or with the script itself.
+function _exec_colorscript() {
+    if _render "$1"; then
+        exec cat -- "${CACHE_RENDER}/$1"
+    fi
+    exec "${DIR_COLORSCRIPTS}/$1"
+}
 
 function _help() {
     echo "Description: A collection of terminal color scripts."
@@ -35,42 +92,36 @@ function _help() {
         "-e, --exec, exec" "Run a specified color script by SCRIPT NAME or INDEX." \
         "-b, --blacklist, blacklist" "Blacklist a color script by SCRIPT NAME or INDEX." \
         "-u, --unblacklist, unblacklist" "Unblacklist a color script by SCRIPT NAME or INDEX." \
-        "-a, --all, all" "List the outputs of all colorscripts with their SCRIPT NAME"
+        "-a, --all, all" "List the outputs of all colorscripts with their SCRIPT NAME" \
+        "--bench [RUNS]" "Time 'colorscript random' with and without the render cache."
 }
 
 function _list() {
-    echo "There are $($LS_CMD | wc -l) installed color scripts:"
-    echo "${list_colorscripts}"
+    _load_index
+    echo "There are ${length_colorscripts} installed color scripts:"
+    _numbered "${list_colorscripts[@]}"
 }
 
 function _list_blacklist() {
+    _load_blacklist
     echo "There are $length_blacklist blacklisted color scripts:"
-    echo "${list_blacklist}"
+    _numbered "${list_blacklist[@]}"
 }
 
 function _random() {
+    _load_index
     if [[ "$length_colorscripts" -le 0 ]]; then
         echo "No color scripts found in ${DIR_COLORSCRIPTS}."
         exit 1
     fi
-    declare -i random_index=$RANDOM%$length_colorscripts
-    [[ $random_index -eq 0 ]] && random_index=1
-
-    random_colorscript="$(echo "${list_colorscripts}" | sed -n "${random_index}p" |
-        tr -d ' ' | tr '\t' ' ' | cut -d ' ' -f 2)"
-    # echo "${random_colorscript}"
-    exec "${DIR_COLORSCRIPTS}/${random_colorscript}"
-}
-
-function ifhascolorscipt() {
-    [[ -e "${DIR_COLORSCRIPTS}/$1" ]] && echo "Has this color script."
+    _exec_colorscript "${list_colorscripts[RANDOM % length_colorscripts]}"
 }
 
 function _run_by_name() {
     if [[ "$1" == "random" ]]; then
         _random
-    elif [[ -n "$(ifhascolorscipt "$1")" ]]; then
-        exec "${DIR_COLORSCRIPTS}/$1"
+    elif [[ -f "${DIR_COLORSCRIPTS}/$1" ]]; then
+        _exec_colorscript "$1"
     else
         echo "Input error, Don't have color script named $1."
         exit 1
@@ -78,11 +129,9 @@ function _run_by_name() {
 }
 
 function _run_by_index() {
+    _load_index
     if [[ "$1" -gt 0 && "$1" -le "${length_colorscripts}" ]]; then
-
-        colorscript="$(echo "${list_colorscripts}" | sed -n "${1}p" |
-            tr -d ' ' | tr '\t' ' ' | cut -d ' ' -f 2)"
-        exec "${DIR_COLORSCRIPTS}/${colorscript}"
+        _exec_colorscript "${list_colorscripts[$1 - 1]}"
     else
         echo "Input error, Don't have color script indexed $1."
         exit 1
@@ -101,11 +150,35 @@ function _run_all() {
     for s in "$DIR_COLORSCRIPTS"/*; do
         [ -f "$s" ] || continue
         printf '%s:\n' "${s##*/}"
-        "$s"
+        if _render "${s##*/}"; then
+            cat -- "${CACHE_RENDER}/${s##*/}"
+        else
+            "$s"
+        fi
         echo
     done
 }
 
+# Mean wall time of a new shell running `colorscript random`, the way a shell rc does.
+function _bench() {
+    local runs="${1:-20}" self mode i start
+    local -A labels=([none]="bash alone" [0]="random, running the script" [1]="random, cached output")
+    self="$(realpath "$0")"
+    printf '%-34s %8s\n' "" "mean ms"
+    for mode in none 0 1; do
+        [[ "$mode" == 1 ]] && COLORSCRIPT_CACHE=1 bash "$self" --all >/dev/null 2>&1
+        start="${EPOCHREALTIME/./}"
+        for ((i = 0; i < runs; i++)); do
+            if [[ "$mode" == none ]]; then
+                bash -c ':'
+            else
+                COLORSCRIPT_CACHE="$mode" bash "$self" random >/dev/null 2>&1
+            fi
+        done
+        printf '%-34s %8d\n' "${labels[$mode]}" $(((${EPOCHREALTIME/./} - start) / runs / 1000))
+    done
+}
+
 function _blacklist_colorscript() { # by name only
     if [ ! -d "${DIR_COLORSCRIPTS}/blacklisted" ]; then
         sudo mkdir "${DIR_COLORSCRIPTS}/blacklisted"
@@ -142,6 +215,9 @@ case "$#" in
     -a | --all | all)
         _run_all
         ;;
+    --bench | bench)
+        _bench
+        ;;
     *)
         echo "Input error."
         exit 1
@@ -155,6 +231,8 @@ case "$#" in
         _blacklist_colorscript "$2"
     elif [[ "$1" == "-u" || "$1" == "--unblacklist" || "$1" == "unblacklist" ]]; then
         _unblacklist_colorscript "$2"
+    elif [[ "$1" == "--bench" || "$1" == "bench" ]]; then
+        _bench "$2"
     else
         echo "Input error."
         exit 1